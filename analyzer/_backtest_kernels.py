@@ -0,0 +1,97 @@
+"""
+Numeric kernels for the backtester
+Plain NumPy with full type annotations so the module can be compiled
+ahead of time with mypyc:
+
+    mypyc analyzer/_backtest_kernels.py
+
+The compiled extension is picked up in place of this file on import, so
+multiprocessing workers pay no JIT warm-up.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# scan_exits result codes
+EXIT_TIMEOUT = 0
+EXIT_TP = 1
+EXIT_SL = -1
+
+
+def build_exit_windows(highs: np.ndarray, lows: np.ndarray,
+                       horizon: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Running high/low over every `horizon`-candle window
+
+    Row j covers candles j..j+horizon-1. The low side is negated so both
+    arrays are non-decreasing along each row and work with searchsorted.
+    """
+    if len(highs) < horizon:
+        empty = np.empty((0, horizon))
+        return empty, empty
+
+    max_high = np.maximum.accumulate(sliding_window_view(highs, horizon), axis=1)
+    neg_min_low = -np.minimum.accumulate(sliding_window_view(lows, horizon), axis=1)
+    return max_high, neg_min_low
+
+
+def scan_exits(max_high: np.ndarray, neg_min_low: np.ndarray,
+               tp_price: float, sl_price: float, is_long: bool) -> tuple[int, int]:
+    """
+    Find the first candle in one exit window where TP or SL is hit
+
+    Returns (exit_bar, code) where code is EXIT_TP, EXIT_SL or EXIT_TIMEOUT.
+    TP wins ties on the same candle, matching a candle-by-candle check.
+    """
+    horizon = len(max_high)
+
+    if is_long:
+        tp_bar = int(np.searchsorted(max_high, tp_price))
+        sl_bar = int(np.searchsorted(neg_min_low, -sl_price))
+    else:
+        tp_bar = int(np.searchsorted(neg_min_low, -tp_price))
+        sl_bar = int(np.searchsorted(max_high, sl_price))
+
+    if tp_bar < horizon and tp_bar <= sl_bar:
+        return tp_bar, EXIT_TP
+    if sl_bar < horizon:
+        return sl_bar, EXIT_SL
+    return horizon - 1, EXIT_TIMEOUT
+
+
+def trade_statistics(outcomes: list[str], profits: list[float],
+                     bars_held: list[int]) -> dict[str, float]:
+    """
+    Performance metrics for a set of trades, passed column by column
+
+    Counts are ints; averages are 0 when there is nothing to average.
+    """
+    total = len(outcomes)
+    win_profits = [p for o, p in zip(outcomes, profits) if o == 'WIN']
+    loss_profits = [p for o, p in zip(outcomes, profits) if o == 'LOSS']
+
+    win_rate = (len(win_profits) / total * 100) if total > 0 else 0
+
+    avg_profit = np.mean(profits) if profits else 0
+    avg_win = np.mean(win_profits) if win_profits else 0
+    avg_loss = np.mean(loss_profits) if loss_profits else 0
+
+    total_profit = sum(win_profits)
+    total_loss = abs(sum(loss_profits))
+    profit_factor = (total_profit / total_loss) if total_loss > 0 else 0
+
+    avg_bars_held = np.mean(bars_held) if bars_held else 0
+
+    return {
+        'total_trades': total,
+        'wins': len(win_profits),
+        'losses': len(loss_profits),
+        'win_rate': win_rate,
+        'avg_profit': avg_profit,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'profit_factor': profit_factor,
+        'avg_bars_held': avg_bars_held,
+        'total_profit_pct': total_profit,
+        'total_loss_pct': total_loss
+    }
@@ -0,0 +1,113 @@
+"""
+Numba-compiled RSI kernels
+Same recurrence as ta's RSIIndicator (Wilder smoothing, alpha = 1/period,
+seeded from the first bar) so values match the pandas path
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback when numba isn't installed - leaves the function as plain Python"""
+        return lambda func: func
+
+
+# No fastmath: it would let numba assume no NaNs, and the warm-up bars are NaN.
+# nogil lets scans calling this from worker threads run it in parallel.
+@njit(cache=True, nogil=True)
+def wilder_rsi(close, period=14):
+    """
+    RSI of a float64 close array
+    
+    Returns an array of the same length; the first period-1 values are NaN.
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    alpha = 1.0 / period
+    avg_up = 0.0
+    avg_down = 0.0
+    
+    for i in range(1, n):
+        diff = close[i] - close[i - 1]
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        avg_up = (1.0 - alpha) * avg_up + alpha * up
+        avg_down = (1.0 - alpha) * avg_down + alpha * down
+        
+        if i >= period - 1:
+            if avg_down == 0:
+                out[i] = 100.0
+            else:
+                out[i] = 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+    
+    return out
+
+
+@njit(cache=True, nogil=True)
+def wilder_rsi_update(close, avg_up, avg_down, last_close, count, period=14):
+    """
+    Continue the wilder_rsi() recurrence over closes that follow earlier ones
+    
+    `count` is how many closes the averages already cover (0 to start fresh),
+    `last_close` the latest of them. Returns (rsi, avg_up, avg_down).
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    alpha = 1.0 / period
+    
+    for j in range(n):
+        if count > 0:
+            diff = close[j] - last_close
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else 0.0
+            avg_up = (1.0 - alpha) * avg_up + alpha * up
+            avg_down = (1.0 - alpha) * avg_down + alpha * down
+        
+        last_close = close[j]
+        count += 1
+        
+        if count >= period:
+            if avg_down == 0:
+                out[j] = 100.0
+            else:
+                out[j] = 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+    
+    return out, avg_up, avg_down
+
+
+@njit(cache=True, nogil=True)
+def classify_and_trend(rsi, thresholds):
+    """
+    Zone and trend codes for the latest value of an RSI array
+    
+    Zone is the index of the first threshold the RSI is <= to (len(thresholds)
+    when above all of them). Trend compares the mean of the last 3 values with
+    the 2 before: 0 unknown (< 5 values), 1 rising, 2 falling, 3 stable.
+    """
+    n = rsi.shape[0]
+    current = rsi[n - 1]
+    
+    zone = thresholds.shape[0]
+    for i in range(thresholds.shape[0]):
+        if current <= thresholds[i]:
+            zone = i
+            break
+    
+    if n < 5:
+        return zone, 0
+    
+    recent_avg = (rsi[n - 3] + rsi[n - 2] + rsi[n - 1]) / 3.0
+    previous_avg = (rsi[n - 5] + rsi[n - 4]) / 2.0
+    if recent_avg > previous_avg + 2:
+        trend = 1
+    elif recent_avg < previous_avg - 2:
+        trend = 2
+    else:
+        trend = 3
+    
+    return zone, trend
@@ -3,12 +3,72 @@ Backtesting Engine for RSI Divergence Strategy
 Tests historical performance and optimizes parameters
 """
 
+import time
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from analyzer.data_fetcher import DataFetcher
 from analyzer.rsi_calculator import RSICalculator
 from analyzer.divergence_detector import StructuralDivergenceDetector
+from analyzer._backtest_kernels import build_exit_windows, scan_exits, trade_statistics, EXIT_TP, EXIT_SL
+
+# Candle length per timeframe, and how many candles make up one day
+_TF_MINUTES = {
+    '1m': 1, '5m': 5, '15m': 15, '30m': 30,
+    '1h': 60, '4h': 240, '1d': 1440
+}
+_CANDLES_PER_DAY = {tf: 1440 // minutes for tf, minutes in _TF_MINUTES.items()}
+
+
+@dataclass(slots=True)
+class TradeOutcome:
+    """Result of simulating a single trade after entry"""
+    exit_price: float
+    exit_time: object
+    outcome: str
+    profit_pct: float
+    bars_held: int
+
+
+@dataclass(slots=True)
+class TradeRecord:
+    """A simulated trade - slotted to keep per-signal memory low"""
+    symbol: str
+    timeframe: str
+    entry_time: object
+    entry_price: float
+    signal_type: str
+    direction: str
+    tp_price: float
+    sl_price: float
+    exit_price: float
+    exit_time: object
+    outcome: str
+    profit_pct: float
+    bars_held: int
+    strength: float
+
+
+# Column layout for exported trades. Explicit dtypes let export_results
+# build the DataFrame without per-column type inference
+TRADE_DTYPE = np.dtype([
+    ('symbol', 'U20'),
+    ('timeframe', 'U4'),
+    ('entry_time', 'datetime64[ns]'),
+    ('entry_price', 'f8'),
+    ('signal_type', 'U8'),
+    ('direction', 'U6'),
+    ('tp_price', 'f8'),
+    ('sl_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('exit_time', 'datetime64[ns]'),
+    ('outcome', 'U8'),
+    ('profit_pct', 'f8'),
+    ('bars_held', 'i4'),
+    ('strength', 'f8')
+])
+
 
 class DivergenceBacktester:
     """
@@ -68,6 +128,7 @@ class DivergenceBacktester:
         
         # Calculate RSI
         df = self.rsi_calc.calculate_rsi(df)
+        exit_windows = self._build_exit_windows(df)
         
         coin_trades = []
         
@@ -75,10 +136,14 @@ class DivergenceBacktester:
         # We scan through history and detect divergences as they would have appeared
         window_size = 100  # Use 100 candles for detection
         
+        # Throttle progress output to once per second (stdout is slow
+        # when signals are dense)
+        last_progress = time.monotonic()
+        
         for i in range(window_size, len(df) - 20):  # Leave 20 candles for exit simulation
-            # Get data window up to current candle
-            window_df = df.iloc[max(0, i-window_size):i+1].copy()
-            window_df = window_df.reset_index(drop=True)
+            # Get data window up to current candle. The detector only reads
+            # positionally (.iloc / .values), so a view is enough - no copy
+            window_df = df.iloc[i-window_size:i+1]
             
             # Detect divergence
             divergences = self.detector.detect_all_divergences(window_df)
@@ -105,7 +170,8 @@ class DivergenceBacktester:
                 
                 # Simulate trade outcome (check next 20 candles)
                 trade_result = self._simulate_trade_outcome(
-                    df.iloc[i+1:i+21],  # Next 20 candles
+                    exit_windows,
+                    i,
                     entry_price,
                     tp_price,
                     sl_price,
@@ -113,28 +179,30 @@ class DivergenceBacktester:
                 )
                 
                 # Record trade
-                trade = {
-                    'symbol': symbol,
-                    'timeframe': timeframe,
-                    'entry_time': entry_time,
-                    'entry_price': entry_price,
-                    'signal_type': signal_type,
-                    'direction': direction,
-                    'tp_price': tp_price,
-                    'sl_price': sl_price,
-                    'exit_price': trade_result['exit_price'],
-                    'exit_time': trade_result['exit_time'],
-                    'outcome': trade_result['outcome'],
-                    'profit_pct': trade_result['profit_pct'],
-                    'bars_held': trade_result['bars_held'],
-                    'strength': div['strength']
-                }
+                trade = TradeRecord(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    entry_time=entry_time,
+                    entry_price=entry_price,
+                    signal_type=signal_type,
+                    direction=direction,
+                    tp_price=tp_price,
+                    sl_price=sl_price,
+                    exit_price=trade_result.exit_price,
+                    exit_time=trade_result.exit_time,
+                    outcome=trade_result.outcome,
+                    profit_pct=trade_result.profit_pct,
+                    bars_held=trade_result.bars_held,
+                    strength=div['strength']
+                )
                 
                 coin_trades.append(trade)
                 self.trades.append(trade)
-                
-                if len(coin_trades) % 10 == 0:  # Progress update every 10 signals
-                    print(f"  Processed {len(coin_trades)} signals...")
+            
+            now = time.monotonic()
+            if now - last_progress >= 1.0:
+                print(f"  Processed {len(coin_trades)} signals...")
+                last_progress = now
         
         # Calculate statistics for this coin
         if coin_trades:
@@ -161,16 +229,8 @@ class DivergenceBacktester:
         Since DataFetcher.fetch_ohlcv() doesn't support 'since',
         we'll just request the maximum limit and filter by date
         """
-        # Calculate timeframe in minutes
-        tf_minutes = {
-            '1m': 1, '5m': 5, '15m': 15, '30m': 30,
-            '1h': 60, '4h': 240, '1d': 1440
-        }
-        minutes = tf_minutes.get(timeframe, 15)
-        
-        # Calculate total candles needed
-        candles_per_day = 1440 // minutes
-        total_candles = lookback_days * candles_per_day
+        # Calculate total candles needed (unknown timeframes default to 15m)
+        total_candles = lookback_days * _CANDLES_PER_DAY.get(timeframe, 96)
         
         print(f"  Need ~{total_candles} candles for {lookback_days} days")
         
@@ -193,110 +253,81 @@ class DivergenceBacktester:
         
         return df
     
-    def _simulate_trade_outcome(self, future_df, entry_price, tp_price, sl_price, direction):
+    def _build_exit_windows(self, df, horizon=20):
         """
-        Simulate what would have happened after entry
+        Precompute running high/low over every 20-candle exit window
         
-        Checks each subsequent candle to see if TP or SL was hit
+        Row j of each array covers candles j..j+horizon-1, so the exit
+        window for a signal at candle i is row i+1. Running max/min are
+        monotonic, which lets _simulate_trade_outcome find the first
+        TP/SL touch with a binary search instead of iterating rows.
         """
-        if future_df.empty:
-            return {
-                'exit_price': entry_price,
-                'exit_time': None,
-                'outcome': 'TIMEOUT',
-                'profit_pct': 0,
-                'bars_held': 0
-            }
-        
-        for idx, row in future_df.iterrows():
-            bars_held = idx - future_df.index[0] + 1
-            
-            if direction == 'LONG':
-                # Check if TP hit
-                if row['high'] >= tp_price:
-                    return {
-                        'exit_price': tp_price,
-                        'exit_time': row['timestamp'],
-                        'outcome': 'WIN',
-                        'profit_pct': ((tp_price - entry_price) / entry_price) * 100,
-                        'bars_held': bars_held
-                    }
-                # Check if SL hit
-                if row['low'] <= sl_price:
-                    return {
-                        'exit_price': sl_price,
-                        'exit_time': row['timestamp'],
-                        'outcome': 'LOSS',
-                        'profit_pct': ((sl_price - entry_price) / entry_price) * 100,
-                        'bars_held': bars_held
-                    }
-            
-            else:  # SHORT
-                # Check if TP hit
-                if row['low'] <= tp_price:
-                    return {
-                        'exit_price': tp_price,
-                        'exit_time': row['timestamp'],
-                        'outcome': 'WIN',
-                        'profit_pct': ((entry_price - tp_price) / entry_price) * 100,
-                        'bars_held': bars_held
-                    }
-                # Check if SL hit
-                if row['high'] >= sl_price:
-                    return {
-                        'exit_price': sl_price,
-                        'exit_time': row['timestamp'],
-                        'outcome': 'LOSS',
-                        'profit_pct': ((entry_price - sl_price) / entry_price) * 100,
-                        'bars_held': bars_held
-                    }
-        
-        # No TP/SL hit - exit at last price
-        last_price = future_df.iloc[-1]['close']
-        if direction == 'LONG':
-            profit_pct = ((last_price - entry_price) / entry_price) * 100
-        else:
-            profit_pct = ((entry_price - last_price) / entry_price) * 100
+        max_high, neg_min_low = build_exit_windows(
+            df['high'].to_numpy(dtype=float),
+            df['low'].to_numpy(dtype=float),
+            horizon
+        )
         
         return {
-            'exit_price': last_price,
-            'exit_time': future_df.iloc[-1]['timestamp'],
-            'outcome': 'TIMEOUT',
-            'profit_pct': profit_pct,
-            'bars_held': len(future_df)
+            'max_high': max_high,
+            'neg_min_low': neg_min_low,
+            'close': df['close'].to_numpy(),
+            'timestamp': df['timestamp'].to_numpy()
         }
     
-    def _calculate_statistics(self, trades):
-        """Calculate performance metrics"""
-        total = len(trades)
-        wins = [t for t in trades if t['outcome'] == 'WIN']
-        losses = [t for t in trades if t['outcome'] == 'LOSS']
-        
-        win_rate = (len(wins) / total * 100) if total > 0 else 0
-        
-        avg_profit = np.mean([t['profit_pct'] for t in trades]) if trades else 0
-        avg_win = np.mean([t['profit_pct'] for t in wins]) if wins else 0
-        avg_loss = np.mean([t['profit_pct'] for t in losses]) if losses else 0
-        
-        total_profit = sum([t['profit_pct'] for t in wins])
-        total_loss = abs(sum([t['profit_pct'] for t in losses]))
-        profit_factor = (total_profit / total_loss) if total_loss > 0 else 0
+    def _simulate_trade_outcome(self, exit_windows, entry_idx, entry_price, tp_price, sl_price, direction):
+        """
+        Simulate what would have happened after entry
         
-        avg_bars_held = np.mean([t['bars_held'] for t in trades]) if trades else 0
+        Finds the first candle after entry_idx where TP or SL was hit.
+        TP wins ties on the same candle, matching a candle-by-candle check.
+        """
+        row = entry_idx + 1
+        if row >= len(exit_windows['max_high']):
+            return TradeOutcome(
+                exit_price=entry_price,
+                exit_time=None,
+                outcome='TIMEOUT',
+                profit_pct=0,
+                bars_held=0
+            )
+        
+        exit_bar, code = scan_exits(
+            exit_windows['max_high'][row],
+            exit_windows['neg_min_low'][row],
+            tp_price,
+            sl_price,
+            direction == 'LONG'
+        )
+        
+        if code == EXIT_TP:
+            exit_price, outcome = tp_price, 'WIN'
+        elif code == EXIT_SL:
+            exit_price, outcome = sl_price, 'LOSS'
+        else:
+            # No TP/SL hit - exit at last price
+            exit_price, outcome = exit_windows['close'][row + exit_bar], 'TIMEOUT'
         
-        return {
-            'total_trades': total,
-            'wins': len(wins),
-            'losses': len(losses),
-            'win_rate': win_rate,
-            'avg_profit': avg_profit,
-            'avg_win': avg_win,
-            'avg_loss': avg_loss,
-            'profit_factor': profit_factor,
-            'avg_bars_held': avg_bars_held,
-            'total_profit_pct': total_profit,
-            'total_loss_pct': total_loss
-        }
+        if direction == 'LONG':
+            profit_pct = ((exit_price - entry_price) / entry_price) * 100
+        else:
+            profit_pct = ((entry_price - exit_price) / entry_price) * 100
+        
+        return TradeOutcome(
+            exit_price=exit_price,
+            exit_time=pd.Timestamp(exit_windows['timestamp'][row + exit_bar]),
+            outcome=outcome,
+            profit_pct=profit_pct,
+            bars_held=exit_bar + 1
+        )
+    
+    def _calculate_statistics(self, trades: list[TradeOutcome] | list[TradeRecord]) -> dict[str, float]:
+        """Calculate performance metrics (math in _backtest_kernels.trade_statistics)"""
+        return trade_statistics(
+            [t.outcome for t in trades],
+            [t.profit_pct for t in trades],
+            [t.bars_held for t in trades]
+        )
     
     def backtest_multiple_coins(self, symbols, timeframe='15m', lookback_days=365):
         """Run backtest across multiple coins"""
@@ -408,6 +439,7 @@ class DivergenceBacktester:
             return
         
         df = self.rsi_calc.calculate_rsi(df)
+        exit_windows = self._build_exit_windows(df)
         
         # Parameter combinations to test
         swing_windows = [2, 3, 4]
@@ -435,8 +467,7 @@ class DivergenceBacktester:
                     # Quick test on this data
                     temp_trades = []
                     for i in range(100, len(df) - 20):
-                        window_df = df.iloc[max(0, i-100):i+1].copy()
-                        window_df = window_df.reset_index(drop=True)
+                        window_df = df.iloc[i-100:i+1]
                         
                         divs = detector.detect_all_divergences(window_df)
                         if divs:
@@ -452,7 +483,7 @@ class DivergenceBacktester:
                                     direction = 'SHORT'
                                 
                                 result = self._simulate_trade_outcome(
-                                    df.iloc[i+1:i+21],
+                                    exit_windows, i,
                                     entry_price, tp, sl, direction
                                 )
                                 temp_trades.append(result)
@@ -490,8 +521,14 @@ class DivergenceBacktester:
             print("No trades to export")
             return
         
-        df = pd.DataFrame(self.trades)
-        df.to_csv(filename, index=False)
+        records = np.fromiter(
+            (tuple(getattr(t, name) for name in TRADE_DTYPE.names) for t in self.trades),
+            dtype=TRADE_DTYPE,
+            count=len(self.trades)
+        )
+        df = pd.DataFrame.from_records(records)
+        # %g keeps full precision for low-priced coins without repr() formatting
+        df.to_csv(filename, index=False, float_format='%.10g')
         print(f"\n[OK] Results exported to {filename}")
         print(f"     Total trades: {len(self.trades)}")
 
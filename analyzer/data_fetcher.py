@@ -3,12 +3,90 @@ Data fetcher for cryptocurrency market data
 Handles fetching OHLCV data from exchanges
 """
 
+import asyncio
 import ccxt
+import ccxt.async_support as ccxt_async
 import pandas as pd
 from datetime import datetime
 import time
 from config.settings import EXCHANGE
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+_PRICE_DTYPES = {col: 'float64' for col in OHLCV_COLUMNS[1:]}
+
+
+def _to_dataframe(ohlcv):
+    """Raw ccxt OHLCV rows -> DataFrame with datetime timestamps and numeric columns"""
+    # ccxt already parsed the values to numbers (or None) - one cast for all columns
+    df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS).astype(_PRICE_DTYPES)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+
+    return df.dropna()
+
+
+# fetch_ohlcv retry policy, shared by DataFetcher and AsyncDataFetcher
+_MAX_RETRIES = 3
+_RETRY_DELAY = 3  # seconds between retries
+
+
+def _ohlcv_frame(ohlcv, min_rows):
+    """DataFrame of the candles, or None if fewer than `min_rows` came back"""
+    if min_rows and len(ohlcv) < min_rows:
+        return None
+    return _to_dataframe(ohlcv)
+
+
+def _retry_delay(error, symbol, attempt):
+    """
+    Report a failed fetch attempt
+    
+    Returns the seconds to wait before the next attempt, or None when
+    retrying won't help (the exchange rejected the request).
+    """
+    if isinstance(error, ccxt.NetworkError):
+        print(f"⚠️ Network error fetching {symbol} (attempt {attempt}/{_MAX_RETRIES}): {error}")
+        return _RETRY_DELAY
+    if isinstance(error, ccxt.ExchangeError):
+        print(f"⚠️ Exchange error fetching {symbol}: {error}")
+        return None
+    print(f"⚠️ Unexpected error fetching {symbol}: {error}")
+    return _RETRY_DELAY
+
+
+_FUTURES_RETRY_MSG = "↩️ Retrying {symbol} via Binance Futures (USDM)..."
+_FUTURES_FAILED_MSG = "❌ Failed fetching {symbol} even via Futures: {error}"
+_GAVE_UP_MSG = f"❌ Failed to fetch {{symbol}} after {_MAX_RETRIES} attempts."
+
+
+def _use_orjson(exchange):
+    """
+    Decode JSON array responses (OHLCV candles) with orjson when it's installed
+    
+    Objects still go through ccxt's own parser, which keeps numbers as
+    strings for price/amount precision; candle values end up as floats anyway.
+    """
+    if orjson is None:
+        return exchange
+    
+    parse_json = exchange.parse_json
+    
+    def parse_json_fast(http_response):
+        if isinstance(http_response, str) and http_response.startswith('['):
+            try:
+                return orjson.loads(http_response)
+            except orjson.JSONDecodeError:
+                pass
+        return parse_json(http_response)
+    
+    exchange.parse_json = parse_json_fast
+    return exchange
+
+
 class DataFetcher:
     """Fetch real-time market data from exchanges"""
     
@@ -22,13 +100,13 @@ class DataFetcher:
         """Create exchange instance with proper configuration"""
         try:
             exchange_class = getattr(ccxt, exchange_name)
-            exchange = exchange_class({
+            exchange = _use_orjson(exchange_class({
                 'enableRateLimit': True,
                 'options': {
                     'defaultType': 'spot',
                     'adjustForTimeDifference': True
                 }
-            })
+            }))
             
             # Load markets
             exchange.load_markets()
@@ -38,57 +116,37 @@ class DataFetcher:
             print(f"❌ Error connecting to {exchange_name}: {e}")
             raise
     
-    def fetch_ohlcv(self, symbol, timeframe='15m', limit=100):
+    def fetch_ohlcv(self, symbol, timeframe='15m', limit=100, since=None, min_rows=None):
         """
         Fetch OHLCV (Open, High, Low, Close, Volume) data
         with retry and fallback to Binance Futures on failure.
+        
+        If `since` (ms timestamp) is given, only candles from then on are returned.
+        If the exchange returns fewer than `min_rows` candles, returns None
+        without building a DataFrame.
         """
-        max_retries = 3
-        delay = 3  # seconds between retries
-
-        for attempt in range(1, max_retries + 1):
+        for attempt in range(1, _MAX_RETRIES + 1):
             try:
                 # Try fetching data
-                ohlcv = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
-
-                # Convert to DataFrame
-                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-
-                # Ensure numeric data types
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-                df = df.dropna()
-                return df
-
-            except ccxt.NetworkError as e:
-                print(f"⚠️ Network error fetching {symbol} (attempt {attempt}/{max_retries}): {e}")
-                time.sleep(delay)
-            except ccxt.ExchangeError as e:
-                print(f"⚠️ Exchange error fetching {symbol}: {e}")
-                break
+                ohlcv = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since, limit=limit)
+                return _ohlcv_frame(ohlcv, min_rows)
             except Exception as e:
-                print(f"⚠️ Unexpected error fetching {symbol}: {e}")
+                delay = _retry_delay(e, symbol, attempt)
+                if delay is None:
+                    break
                 time.sleep(delay)
 
         # Optional fallback to Binance Futures if spot fails entirely
         if self.exchange_name == "binance":
             try:
-                print(f"↩️ Retrying {symbol} via Binance Futures (USDM)...")
-                futures = ccxt.binanceusdm({'enableRateLimit': True})
-                ohlcv = futures.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=limit)
-
-                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                for col in ['open', 'high', 'low', 'close', 'volume']:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                df = df.dropna()
-                return df
+                print(_FUTURES_RETRY_MSG.format(symbol=symbol))
+                futures = _use_orjson(ccxt.binanceusdm({'enableRateLimit': True}))
+                ohlcv = futures.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since, limit=limit)
+                return _ohlcv_frame(ohlcv, min_rows)
             except Exception as e:
-                print(f"❌ Failed fetching {symbol} even via Futures: {e}")
+                print(_FUTURES_FAILED_MSG.format(symbol=symbol, error=e))
 
-        print(f"❌ Failed to fetch {symbol} after {max_retries} attempts.")
+        print(_GAVE_UP_MSG.format(symbol=symbol))
         return None
 
     
@@ -209,6 +267,59 @@ class DataFetcher:
             print(f"Error getting market info for {symbol}: {e}")
             return None
 
+
+class AsyncDataFetcher:
+    """
+    Non-blocking OHLCV fetcher on ccxt.async_support
+    
+    Same results as DataFetcher.fetch_ohlcv, but each request is a coroutine
+    on the event loop's shared aiohttp session instead of a blocking call
+    in a worker thread. Call close() when done.
+    """
+    
+    def __init__(self, exchange_name=EXCHANGE):
+        self.exchange_name = exchange_name
+        self.exchange = _use_orjson(getattr(ccxt_async, exchange_name)({
+            'enableRateLimit': True,
+            'options': {
+                'defaultType': 'spot',
+                'adjustForTimeDifference': True
+            }
+        }))
+        self._futures = None
+    
+    async def fetch_ohlcv(self, symbol, timeframe='15m', limit=100, since=None, min_rows=None):
+        """Async DataFetcher.fetch_ohlcv() - same retries and Futures fallback"""
+        for attempt in range(1, _MAX_RETRIES + 1):
+            try:
+                ohlcv = await self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since, limit=limit)
+                return _ohlcv_frame(ohlcv, min_rows)
+            except Exception as e:
+                delay = _retry_delay(e, symbol, attempt)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+
+        if self.exchange_name == "binance":
+            try:
+                print(_FUTURES_RETRY_MSG.format(symbol=symbol))
+                if self._futures is None:
+                    self._futures = _use_orjson(ccxt_async.binanceusdm({'enableRateLimit': True}))
+                ohlcv = await self._futures.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since, limit=limit)
+                return _ohlcv_frame(ohlcv, min_rows)
+            except Exception as e:
+                print(_FUTURES_FAILED_MSG.format(symbol=symbol, error=e))
+
+        print(_GAVE_UP_MSG.format(symbol=symbol))
+        return None
+    
+    async def close(self):
+        """Close the exchange HTTP sessions"""
+        await self.exchange.close()
+        if self._futures is not None:
+            await self._futures.close()
+
+
 # Test the data fetcher
 if __name__ == "__main__":
     print("=" * 60)
@@ -243,4 +354,5 @@ if __name__ == "__main__":
         print(f"24h Volume: ${info['volume_24h']:,.0f}")
         print(f"24h Change: {info['change_24h']:.2f}%")
     
-    print("\n✓ Data fetcher test complete!")
\ No newline at end of file
+    print("\n✓ Data fetcher test complete!")
+
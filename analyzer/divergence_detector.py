@@ -50,8 +50,9 @@ class HumanLikeDivergenceDetector:
     def find_prominent_peaks(self, df, column='high'):
         if len(df) < 20:
             return []
+        return self._prominent_peaks(df[column].values)
 
-        data = df[column].values
+    def _prominent_peaks(self, data):
         peaks = argrelextrema(data, lambda x, y: x > y, order=3)
 
         prominent = []
@@ -78,8 +79,9 @@ class HumanLikeDivergenceDetector:
     def find_prominent_troughs(self, df, column='low'):
         if len(df) < 20:
             return []
+        return self._prominent_troughs(df[column].values)
 
-        data = df[column].values
+    def _prominent_troughs(self, data):
         troughs = argrelextrema(data, lambda x, y: x < y, order=3)
 
         prominent = []
@@ -108,13 +110,17 @@ class HumanLikeDivergenceDetector:
     # ---------------------------------------------------------
 
     def get_rsi_at_peaks(self, df, price_peaks):
+        # Positional array lookups work the same on window views with any index
+        return self._rsi_at_peaks(df["rsi"].to_numpy(), price_peaks)
+
+    def _rsi_at_peaks(self, rsi, price_peaks):
         r = []
         for p in price_peaks:
             idx = p["index"]
             r.append({
                 "index": idx,
                 "price": p["value"],
-                "rsi": df["rsi"].iloc[idx],
+                "rsi": rsi[idx],
                 "prominence": p["prominence"]
             })
         return r
@@ -145,21 +151,24 @@ class HumanLikeDivergenceDetector:
         return True, "Valid"
 
     def check_price_action_confirms(self, df, div, idx):
+        return self._confirms(df["close"].to_numpy(), div, idx)
+
+    def _confirms(self, close, div, idx):
         if not self.require_confirmation:
             return True, "Skip"
 
-        if idx + 3 >= len(df):
+        if idx + 3 >= len(close):
             return False, "Not enough candles"
 
-        now = df["close"].iloc[idx]
-        next_prices = df["close"].iloc[idx+1:idx+4]
+        now = close[idx]
+        next_prices = close[idx+1:idx+4]
 
         if div == "BEARISH":
-            if sum(1 for p in next_prices if p < now) < 2:
+            if np.count_nonzero(next_prices < now) < 2:
                 return False, "Price not falling"
 
         if div == "BULLISH":
-            if sum(1 for p in next_prices if p > now) < 2:
+            if np.count_nonzero(next_prices > now) < 2:
                 return False, "Price not rising"
 
         return True, "Confirmed"
@@ -171,19 +180,24 @@ class HumanLikeDivergenceDetector:
     def detect_bearish_divergence(self, df):
         if df is None or len(df) < 30:
             return None
+        return self._detect_bearish(
+            df["high"].to_numpy(), df["close"].to_numpy(), df["rsi"].to_numpy(),
+            df["timestamp"].iloc[-1]
+        )
 
-        peaks = self.find_prominent_peaks(df)
+    def _detect_bearish(self, high, close, rsi, timestamp):
+        peaks = self._prominent_peaks(high)
         if len(peaks) < 2:
             return None
 
-        peaks_rsi = self.get_rsi_at_peaks(df, peaks)
+        peaks_rsi = self._rsi_at_peaks(rsi, peaks)
         p1, p2 = peaks_rsi[-2], peaks_rsi[-1]
 
         valid, reason = self.validate_divergence_alignment(p1, p2, "BEARISH")
         if not valid:
             return None
 
-        confirmed, c_reason = self.check_price_action_confirms(df, "BEARISH", p2["index"])
+        confirmed, c_reason = self._confirms(close, "BEARISH", p2["index"])
         if not confirmed:
             return None
 
@@ -207,9 +221,9 @@ class HumanLikeDivergenceDetector:
             "rsi2": float(p2["rsi"]),
             "price_change_pct": round(price_pct, 2),
             "rsi_change": round(rsi_ch, 2),
-            "current_price": float(df["close"].iloc[-1]),
-            "current_rsi": float(df["rsi"].iloc[-1]),
-            "timestamp": df["timestamp"].iloc[-1],
+            "current_price": float(close[-1]),
+            "current_rsi": float(rsi[-1]),
+            "timestamp": timestamp,
             "quality": quality,
             "quality_label": self._get_quality_label(quality),
             "confirmed": confirmed,
@@ -219,19 +233,24 @@ class HumanLikeDivergenceDetector:
     def detect_bullish_divergence(self, df):
         if df is None or len(df) < 30:
             return None
+        return self._detect_bullish(
+            df["low"].to_numpy(), df["close"].to_numpy(), df["rsi"].to_numpy(),
+            df["timestamp"].iloc[-1]
+        )
 
-        troughs = self.find_prominent_troughs(df)
+    def _detect_bullish(self, low, close, rsi, timestamp):
+        troughs = self._prominent_troughs(low)
         if len(troughs) < 2:
             return None
 
-        with_rsi = self.get_rsi_at_peaks(df, troughs)
+        with_rsi = self._rsi_at_peaks(rsi, troughs)
         t1, t2 = with_rsi[-2], with_rsi[-1]
 
         valid, reason = self.validate_divergence_alignment(t1, t2, "BULLISH")
         if not valid:
             return None
 
-        confirmed, c_reason = self.check_price_action_confirms(df, "BULLISH", t2["index"])
+        confirmed, c_reason = self._confirms(close, "BULLISH", t2["index"])
         if not confirmed:
             return None
 
@@ -255,15 +274,53 @@ class HumanLikeDivergenceDetector:
             "rsi2": float(t2["rsi"]),
             "price_change_pct": round(abs(price_pct), 2),
             "rsi_change": round(abs(rsi_ch), 2),
-            "current_price": float(df["close"].iloc[-1]),
-            "current_rsi": float(df["rsi"].iloc[-1]),
-            "timestamp": df["timestamp"].iloc[-1],
+            "current_price": float(close[-1]),
+            "current_rsi": float(rsi[-1]),
+            "timestamp": timestamp,
             "quality": quality,
             "quality_label": self._get_quality_label(quality),
             "confirmed": confirmed,
             "explanation": reason
         }
 
+    # ---------------------------------------------------------
+    # COMBINED ENTRY POINTS
+    # ---------------------------------------------------------
+
+    def detect_all_divergences(self, df):
+        if df is None or len(df) < 30:
+            return []
+        return self.detect_all_divergences_arr(
+            df["high"].to_numpy(), df["low"].to_numpy(),
+            df["close"].to_numpy(), df["rsi"].to_numpy(),
+            0, len(df), df["timestamp"].array
+        )
+
+    def detect_all_divergences_arr(self, high, low, close, rsi, start, end, timestamps=None):
+        """
+        Bearish and bullish divergences in the window [start, end) of full-length arrays
+
+        Slices are NumPy views, so walking a backtest window by window builds
+        no DataFrames. Pass df["timestamp"].array as timestamps to get
+        pd.Timestamp values in the results.
+        """
+        if end - start < 30:
+            return []
+
+        timestamp = timestamps[end - 1] if timestamps is not None else None
+        window = slice(start, end)
+        found = []
+
+        bearish = self._detect_bearish(high[window], close[window], rsi[window], timestamp)
+        if bearish:
+            found.append(bearish)
+
+        bullish = self._detect_bullish(low[window], close[window], rsi[window], timestamp)
+        if bullish:
+            found.append(bullish)
+
+        return found
+
     # ---------------------------------------------------------
     # QUALITY SYSTEM
     # ---------------------------------------------------------
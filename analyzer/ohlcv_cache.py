@@ -0,0 +1,144 @@
+"""
+In-memory OHLCV cache shared by the scheduled scan, /scan, /quick and /zones
+Entries are keyed by (symbol, timeframe, current candle) so they expire
+on their own when a new candle opens. Misses go to the persistent SQLite
+store, so after a restart only new candles are fetched
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from analyzer.persistent_cache import PersistentOHLCVCache
+
+# Seconds per candle - used to bucket cache keys by the current candle
+TIMEFRAME_SECONDS = {
+    '1m': 60, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '4h': 14400, '1d': 86400
+}
+
+MAX_ENTRIES = 2048
+
+_cache = OrderedDict()
+_lock = threading.Lock()  # fetches run in executor threads
+_stats = {'hits': 0, 'misses': 0}
+_store = None
+_store_failed = False
+
+
+def _get_store():
+    """Open the persistent store on first use; None if it can't be opened"""
+    global _store, _store_failed
+    with _lock:
+        if _store is None and not _store_failed:
+            try:
+                _store = PersistentOHLCVCache()
+            except Exception as e:
+                print(f"⚠️ Persistent OHLCV cache unavailable, using memory only: {e}")
+                _store_failed = True
+        return _store
+
+
+def cached_fetch(fetcher, symbol, timeframe='15m', limit=100, min_rows=None):
+    """
+    fetcher.fetch_ohlcv() with a per-candle cache
+    
+    A cached frame serves any request for the same or fewer candles, so
+    a 200-candle /scan fetch also covers a 100-candle /zones fetch.
+    
+    Returns:
+        DataFrame (a fresh frame the caller may modify) or None, also
+        None when fewer than `min_rows` candles are available
+    """
+    bar_seconds = TIMEFRAME_SECONDS.get(timeframe, 900)
+    key = (symbol, timeframe, int(time.time() // bar_seconds))
+    
+    hit, df = _lookup(key, limit, min_rows)
+    if hit:
+        return df
+    
+    store = _get_store()
+    if store is not None:
+        try:
+            df = store.fetch(fetcher, symbol, timeframe, limit, bar_seconds, min_rows)
+        except Exception as e:
+            print(f"⚠️ Persistent cache error for {symbol} ({timeframe}): {e}")
+            df = fetcher.fetch_ohlcv(symbol, timeframe, limit=limit, min_rows=min_rows)
+    else:
+        df = fetcher.fetch_ohlcv(symbol, timeframe, limit=limit, min_rows=min_rows)
+    
+    return _remember(key, limit, df)
+
+
+async def cached_fetch_async(fetcher, symbol, timeframe='15m', limit=100, min_rows=None):
+    """cached_fetch() for an AsyncDataFetcher - same cache and persistent store"""
+    bar_seconds = TIMEFRAME_SECONDS.get(timeframe, 900)
+    key = (symbol, timeframe, int(time.time() // bar_seconds))
+    
+    hit, df = _lookup(key, limit, min_rows)
+    if hit:
+        return df
+    
+    store = await asyncio.to_thread(_get_store)
+    if store is not None:
+        try:
+            df = await store.fetch_async(fetcher, symbol, timeframe, limit, bar_seconds, min_rows)
+        except Exception as e:
+            print(f"⚠️ Persistent cache error for {symbol} ({timeframe}): {e}")
+            df = await fetcher.fetch_ohlcv(symbol, timeframe, limit=limit, min_rows=min_rows)
+    else:
+        df = await fetcher.fetch_ohlcv(symbol, timeframe, limit=limit, min_rows=min_rows)
+    
+    return _remember(key, limit, df)
+
+
+def _lookup(key, limit, min_rows):
+    """(True, frame or None) on a cache hit, (False, None) on a miss"""
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] >= limit:
+            _cache.move_to_end(key)
+            _stats['hits'] += 1
+            if min_rows and len(entry[1]) < min_rows:
+                return True, None
+            return True, entry[1].iloc[-limit:].reset_index(drop=True)
+        _stats['misses'] += 1
+    return False, None
+
+
+def _remember(key, limit, df):
+    """Cache a fetched frame and return a copy for the caller"""
+    if df is None:
+        return None
+    
+    with _lock:
+        _cache[key] = (limit, df)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    
+    return df.reset_index(drop=True)
+
+
+def is_cached(symbol, timeframe='15m', limit=100):
+    """Whether cached_fetch() would be served from memory right now"""
+    bucket = int(time.time() // TIMEFRAME_SECONDS.get(timeframe, 900))
+    with _lock:
+        entry = _cache.get((symbol, timeframe, bucket))
+        return entry is not None and entry[0] >= limit
+
+
+def cache_stats():
+    """Get cache hit/miss counters and current size"""
+    with _lock:
+        return {
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+            'size': len(_cache)
+        }
+
+
+def clear_cache():
+    """Drop all cached frames"""
+    with _lock:
+        _cache.clear()
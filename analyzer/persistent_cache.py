@@ -0,0 +1,159 @@
+"""
+Persistent OHLCV store (SQLite, WAL mode)
+Keeps the most recent candles per symbol/timeframe across restarts, so a
+restarted bot only fetches the candles it missed instead of full history
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+from config.settings import OHLCV_CACHE_PATH
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class PersistentOHLCVCache:
+    """SQLite-backed candle store used behind the in-memory OHLCV cache"""
+    
+    def __init__(self, db_path=OHLCV_CACHE_PATH, max_candles=500):
+        self.db_path = db_path
+        self.max_candles = max_candles
+        
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        
+        # Shared by the fetch worker threads, serialized with a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS ohlcv (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, timeframe, ts)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.commit()
+    
+    def get(self, symbol, timeframe):
+        """Get stored candles (oldest first) or None"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT ts, open, high, low, close, volume FROM ohlcv
+                WHERE symbol = ? AND timeframe = ?
+                ORDER BY ts
+            ''', (symbol, timeframe)).fetchall()
+        
+        if not rows:
+            return None
+        
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+    
+    def put(self, symbol, timeframe, df, replace_older=False):
+        """
+        Store candles (replacing same timestamps) and trim to max_candles
+        
+        replace_older: also drop this key's candles older than the first new
+        one, in the same transaction - for a full fetch, whose candles may
+        not join up with what was stored before
+        """
+        ts = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype('int64')
+        rows = zip(
+            [symbol] * len(df), [timeframe] * len(df), ts.tolist(),
+            df['open'].tolist(), df['high'].tolist(), df['low'].tolist(),
+            df['close'].tolist(), df['volume'].tolist()
+        )
+        
+        with self._lock, self._conn:
+            if replace_older:
+                self._conn.execute(
+                    'DELETE FROM ohlcv WHERE symbol = ? AND timeframe = ? AND ts < ?',
+                    (symbol, timeframe, int(ts[0]))
+                )
+            self._conn.executemany('''
+                INSERT OR REPLACE INTO ohlcv
+                (symbol, timeframe, ts, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self._conn.execute('''
+                DELETE FROM ohlcv
+                WHERE symbol = ? AND timeframe = ? AND ts < (
+                    SELECT ts FROM ohlcv WHERE symbol = ? AND timeframe = ?
+                    ORDER BY ts DESC LIMIT 1 OFFSET ?
+                )
+            ''', (symbol, timeframe, symbol, timeframe, self.max_candles - 1))
+    
+    def _plan_top_up(self, symbol, timeframe, limit, bar_seconds):
+        """
+        (stored, since_ms, fetch_limit) when stored candles can be topped up, else None
+        
+        Only tops up when the latest `limit` stored candles are contiguous;
+        a hole means the result would splice non-adjacent candles together,
+        so a full fetch is done instead.
+        """
+        stored = self.get(symbol, timeframe)
+        
+        if stored is not None and len(stored) >= limit:
+            ts = stored['timestamp'].to_numpy(dtype='datetime64[ms]').astype('int64')[-limit:]
+            if (np.diff(ts) != bar_seconds * 1000).any():
+                return None
+            
+            last_ms = int(ts[-1])
+            missing = int((time.time() * 1000 - last_ms) // (bar_seconds * 1000)) + 1
+            
+            if missing < limit:
+                return stored, last_ms, missing + 1
+        return None
+    
+    def _merge(self, symbol, timeframe, stored, new, limit):
+        """Store newly fetched candles and return the latest `limit` of stored + new"""
+        self.put(symbol, timeframe, new)
+        df = pd.concat([stored, new], ignore_index=True)
+        df = df.drop_duplicates(subset='timestamp', keep='last')
+        return df.iloc[-limit:].reset_index(drop=True)
+    
+    def fetch(self, fetcher, symbol, timeframe, limit, bar_seconds, min_rows=None):
+        """
+        Fetch candles, only requesting what isn't stored yet
+        
+        The last stored candle is re-fetched too, since it may have been
+        stored while still open.
+        
+        Returns:
+            DataFrame with up to `limit` candles or None
+        """
+        plan = self._plan_top_up(symbol, timeframe, limit, bar_seconds)
+        if plan is not None:
+            stored, since, fetch_limit = plan
+            new = fetcher.fetch_ohlcv(symbol, timeframe, limit=fetch_limit, since=since)
+            if new is not None and not new.empty:
+                return self._merge(symbol, timeframe, stored, new, limit)
+        
+        df = fetcher.fetch_ohlcv(symbol, timeframe, limit=limit, min_rows=min_rows)
+        if df is not None and not df.empty:
+            self.put(symbol, timeframe, df, replace_older=True)
+        return df
+    
+    async def fetch_async(self, fetcher, symbol, timeframe, limit, bar_seconds, min_rows=None):
+        """fetch() for an async fetcher; SQLite work runs in a thread"""
+        plan = await asyncio.to_thread(self._plan_top_up, symbol, timeframe, limit, bar_seconds)
+        if plan is not None:
+            stored, since, fetch_limit = plan
+            new = await fetcher.fetch_ohlcv(symbol, timeframe, limit=fetch_limit, since=since)
+            if new is not None and not new.empty:
+                return await asyncio.to_thread(self._merge, symbol, timeframe, stored, new, limit)
+        
+        df = await fetcher.fetch_ohlcv(symbol, timeframe, limit=limit, min_rows=min_rows)
+        if df is not None and not df.empty:
+            await asyncio.to_thread(self.put, symbol, timeframe, df, True)
+        return df
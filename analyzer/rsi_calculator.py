@@ -5,9 +5,66 @@ Calculates RSI and identifies overbought/oversold conditions
 
 import pandas as pd
 import numpy as np
-from ta.momentum import RSIIndicator
+from functools import lru_cache
+from analyzer._rsi_numba import wilder_rsi, wilder_rsi_update, NUMBA_AVAILABLE
 from config.settings import RSI_PERIOD, RSI_OVERBOUGHT, RSI_OVERSOLD
 
+
+def _wilder_rsi_ewm(close, period=14):
+    """
+    NumPy/pandas Wilder RSI, same values as ta's RSIIndicator
+    
+    Used when numba isn't installed; the smoothing runs in pandas' C ewm
+    instead of going through ta's Series plumbing.
+    """
+    diff = np.diff(close, prepend=close[0])
+    gain = np.where(diff > 0, diff, 0.0)
+    loss = np.where(diff < 0, -diff, 0.0)
+    
+    alpha = 1.0 / period
+    avg_gain = pd.Series(gain).ewm(alpha=alpha, min_periods=period, adjust=False).mean().to_numpy()
+    avg_loss = pd.Series(loss).ewm(alpha=alpha, min_periods=period, adjust=False).mean().to_numpy()
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi[avg_loss == 0] = 100.0
+    return rsi
+
+
+@lru_cache(maxsize=512)
+def _cached_rsi(close_bytes, period=14):
+    """
+    RSI memoized on the raw close prices
+    
+    Keyed on the bytes rather than symbol/timestamp because every coin
+    shares the same candle timestamps. The result is read-only; callers
+    copy it into their frame.
+    """
+    close = np.frombuffer(close_bytes, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        rsi = wilder_rsi(close, period)
+    else:
+        rsi = _wilder_rsi_ewm(close, period)
+    rsi.flags.writeable = False
+    return rsi
+
+
+def _attach_rsi(df, rsi):
+    """
+    Rows from the first RSI value on, with the rsi column and a fresh index
+    
+    The NaNs are only the warm-up rows at the start, so one slice + copy
+    replaces dropna() followed by reset_index().
+    """
+    valid = ~np.isnan(rsi)
+    start = int(valid.argmax()) if valid.any() else len(rsi)
+    
+    df = df.iloc[start:].copy()
+    df['rsi'] = rsi[start:].copy()
+    df.index = pd.RangeIndex(len(df))
+    return df
+
+
 class RSICalculator:
     """Calculates RSI with safe handling and alignment"""
 
@@ -15,14 +72,87 @@ class RSICalculator:
         if column not in df.columns:
             raise ValueError(f"Column '{column}' not found in dataframe")
 
-        # Calculate RSI using ta library
-        rsi = RSIIndicator(close=df[column], window=14).rsi()
+        # Compiled kernel when numba is installed, else vectorized NumPy/pandas;
+        # identical closes (overlapping rescans, repeat ticks) hit the memo
+        close = np.ascontiguousarray(df[column].to_numpy(dtype=np.float64))
+        rsi = _cached_rsi(close.tobytes(), 14)
+
+        # Add RSI to dataframe and align
+        return _attach_rsi(df, rsi)
 
+    def update_rsi(self, closes, state=None, period=14):
+        """
+        Streaming RSI over closes that follow the ones in `state`
+        
+        Args:
+            closes: float64 array of new closes only
+            state: State returned by a previous call, or None to start fresh
+        
+        Returns:
+            (rsi array for `closes`, new state)
+        """
+        if state is None:
+            state = {'avg_up': 0.0, 'avg_down': 0.0, 'last_close': 0.0, 'count': 0}
+        
+        rsi, avg_up, avg_down = wilder_rsi_update(
+            closes, state['avg_up'], state['avg_down'],
+            state['last_close'], state['count'], period
+        )
+        
+        if len(closes) == 0:
+            return rsi, state
+        return rsi, {
+            'avg_up': avg_up,
+            'avg_down': avg_down,
+            'last_close': float(closes[-1]),
+            'count': state['count'] + len(closes)
+        }
+
+    def calculate_rsi_streaming(self, df, state=None, column='close'):
+        """
+        calculate_rsi() for a sliding frame, reusing the previous frame's work
+        
+        Only candles after the one recorded in `state` are computed. The last
+        row is the still-open candle: it gets an RSI but isn't folded into the
+        state, so its changing close is recomputed on the next call. Falls
+        back to a full pass when the frame doesn't reach back to the state.
+        
+        Returns:
+            (df, state) - pass the state back with the next frame for the
+            same symbol and timeframe
+        """
+        if column not in df.columns:
+            raise ValueError(f"Column '{column}' not found in dataframe")
+        if df.empty:
+            return df, state
+        
+        close = df[column].to_numpy(dtype=np.float64)
+        timestamps = df['timestamp'].to_numpy()
+        
+        start = 0
+        known_rsi = np.empty(0)
+        rsi_state = None
+        
+        if state is not None:
+            pos = int(np.searchsorted(timestamps, state['timestamp']))
+            if pos < len(timestamps) and timestamps[pos] == state['timestamp'] and pos < len(state['rsi']):
+                start = pos + 1
+                known_rsi = state['rsi'][-start:]
+                rsi_state = state['rsi_state']
+        
+        closed_end = max(len(close) - 1, start)
+        closed_rsi, rsi_state = self.update_rsi(close[start:closed_end], rsi_state)
+        open_rsi, _ = self.update_rsi(close[closed_end:], rsi_state)
+        
+        closed_rsi = np.concatenate((known_rsi, closed_rsi))
+        new_state = {
+            'timestamp': timestamps[closed_end - 1],
+            'rsi': closed_rsi,
+            'rsi_state': rsi_state
+        } if closed_end > 0 else None
+        
         # Add RSI to dataframe and align
-        df['rsi'] = rsi
-        df = df.dropna(subset=['rsi'])
-        df = df.reset_index(drop=True)
-        return df
+        return _attach_rsi(df, np.concatenate((closed_rsi, open_rsi))), new_state
 
     
     def get_rsi_zone(self, rsi_value):
@@ -64,11 +194,13 @@ class RSICalculator:
         if df is None or 'rsi' not in df.columns:
             return None
         
-        recent_df = df.tail(lookback)
+        # Reductions on a view of the column; no tail() copy
+        rsi = df['rsi'].to_numpy()
+        recent = rsi[-lookback:]
         
         return {
-            'highest_rsi': recent_df['rsi'].max(),
-            'lowest_rsi': recent_df['rsi'].min(),
-            'current_rsi': df['rsi'].iloc[-1],
-            'avg_rsi': recent_df['rsi'].mean()
+            'highest_rsi': recent.max(),
+            'lowest_rsi': recent.min(),
+            'current_rsi': rsi[-1],
+            'avg_rsi': recent.mean()
         }
\ No newline at end of file
@@ -233,10 +233,29 @@ class RSISupportResistanceDetector:
             'filters_passed': ['resistance_touches', 'rsi_variance', 'price_trend', 'rejection_strength', 'volume', 'momentum']
         }
     
+    def in_reversal_zone(self, df):
+        """
+        Cheap pre-check mirroring FILTER 1 of both detectors
+        
+        False means neither reversal is possible: the last 15 RSI values
+        never reached the support or resistance zone.
+        """
+        if df is None or 'rsi' not in df.columns or len(df) < 40:
+            return False
+        
+        recent_rsi = df['rsi'].to_numpy()[-15:]
+        low, high = recent_rsi.min(), recent_rsi.max()
+        return (self.rsi_support_zone[0] <= low <= self.rsi_support_zone[1]
+                or self.rsi_resistance_zone[0] <= high <= self.rsi_resistance_zone[1])
+    
     def detect_all_reversals(self, df):
         """Detect both support and resistance reversals"""
         reversals = []
         
+        # Most coins sit in neutral RSI - skip the full checks for them
+        if not self.in_reversal_zone(df):
+            return reversals
+        
         support_reversal = self.detect_rsi_support_reversal(df)
         if support_reversal:
             reversals.append(support_reversal)
@@ -4,11 +4,112 @@ Now supports: 15m, 30m, 1h, 4h timeframes
 Fixed: XMR/USDT data issue handling
 """
 
-from datetime import datetime
 import asyncio
-from analyzer.data_fetcher import DataFetcher
+import time
+from operator import itemgetter
+import numpy as np
+from analyzer.data_fetcher import AsyncDataFetcher
 from analyzer.rsi_calculator import RSICalculator
+from analyzer._rsi_numba import classify_and_trend
+from analyzer.ohlcv_cache import cached_fetch_async, is_cached
 from config.coin_list import DEFAULT_WATCHLIST
+from config.settings import MAX_CONCURRENT_FETCHES
+from utils.rate_limiter import RateLimiter
+
+# Indexed by the codes classify_and_trend() returns
+ZONE_NAMES = (
+    'EXTREME_OVERSOLD', 'OVERSOLD', 'OVERSOLD_ZONE', 'NEUTRAL',
+    'OVERBOUGHT_ZONE', 'OVERBOUGHT', 'EXTREME_OVERBOUGHT'
+)
+TREND_NAMES = ('unknown', 'rising', 'falling', 'stable')
+_ZONE_CODES = {name: code for code, name in enumerate(ZONE_NAMES)}
+_NEUTRAL_CODE = _ZONE_CODES['NEUTRAL']
+
+# Candles fetched per timeframe
+_LIMIT_MAP = {
+    '15m': 100,
+    '30m': 100,
+    '1h': 150,
+    '4h': 200
+}
+
+# Candles in 24 hours, for the price change approximation
+_TF_TO_CANDLES_24H = {
+    '15m': 96,   # 96 * 15min = 24h
+    '30m': 48,   # 48 * 30min = 24h
+    '1h': 24,    # 24 * 1h = 24h
+    '4h': 6      # 6 * 4h = 24h
+}
+
+_RULE = "─" * 62 + "\n"
+
+_TREND_EMOJI = {
+    'rising': '📈',
+    'falling': '📉',
+    'stable': '➡️',
+    'unknown': '❓'
+}
+
+# Telegram shows anything not rising/falling as flat
+_TELEGRAM_TREND_EMOJI = {'rising': '📈', 'falling': '📉'}
+
+# (category, heading, max coins listed) in report order - neutral is left out
+_REPORT_ZONES = (
+    ('extreme_oversold', "🟣 EXTREME OVERSOLD (RSI < 25) - STRONG BUY ZONE", None),
+    ('oversold', "🔵 OVERSOLD (RSI 25-30) - BUY ZONE", None),
+    ('oversold_zone', "🟢 APPROACHING OVERSOLD (RSI 30-40)", 10),
+    ('overbought_zone', "🟡 APPROACHING OVERBOUGHT (RSI 60-70)", 10),
+    ('overbought', "🟠 OVERBOUGHT (RSI 70-75) - SELL ZONE", None),
+    ('extreme_overbought', "🔴 EXTREME OVERBOUGHT (RSI > 75) - STRONG SELL ZONE", None),
+)
+
+_SUMMARY_LABELS = (
+    ('extreme_oversold', "Extreme Oversold:     "),
+    ('oversold', "Oversold:             "),
+    ('oversold_zone', "Approaching Oversold: "),
+    ('neutral', "Neutral:              "),
+    ('overbought_zone', "Approaching Overbought:"),
+    ('overbought', "Overbought:           "),
+    ('extreme_overbought', "Extreme Overbought:   "),
+)
+
+_TELEGRAM_ZONES = (
+    ('extreme_oversold', "🟣 EXTREME OVERSOLD"),
+    ('oversold', "🔵 OVERSOLD"),
+    ('overbought', "🟠 OVERBOUGHT"),
+    ('extreme_overbought', "🔴 EXTREME OVERBOUGHT"),
+)
+
+
+def _sort_zone_buckets(buckets):
+    """
+    Per-zone coin lists (indexed by zone code, in scan order) -> the
+    categorize_results() dict: extremes first, neutral left in scan order
+    """
+    categorized = {}
+    for code, (name, coins) in enumerate(zip(ZONE_NAMES, buckets)):
+        if code != _NEUTRAL_CODE:
+            coins.sort(key=itemgetter('rsi'), reverse=code > _NEUTRAL_CODE)
+        categorized[name.lower()] = coins
+    return categorized
+
+
+def _fmt_zone(parts, title, coins, limit=None):
+    """Append one zone block of the detailed report to `parts`"""
+    if not coins:
+        return
+    
+    parts.append(f"{title}\n")
+    parts.append(_RULE)
+    for coin in coins[:limit]:
+        trend = _TREND_EMOJI.get(coin['trend'], '❓')
+        parts.append(
+            f"  {coin['symbol']:12} RSI: {coin['rsi']:5.1f} {trend} "
+            f"Price: ${coin['price']:>10,.4f} ({coin['price_change_24h']:+.2f}%)\n"
+        )
+    if limit is not None and len(coins) > limit:
+        parts.append(f"  ... and {len(coins) - limit} more\n")
+    parts.append("\n")
 
 
 class RSIZoneScanner:
@@ -29,7 +130,8 @@ class RSIZoneScanner:
                  neutral_low=40,         # Neutral zone lower bound
                  neutral_high=60,        # Neutral zone upper bound
                  overbought=70,          # Overbought threshold
-                 extreme_overbought=75): # Extremely overbought
+                 extreme_overbought=75,  # Extremely overbought
+                 fetcher=None):          # Shared AsyncDataFetcher (optional)
         
         self.extreme_oversold = extreme_oversold
         self.oversold = oversold
@@ -37,40 +139,40 @@ class RSIZoneScanner:
         self.neutral_high = neutral_high
         self.overbought = overbought
         self.extreme_overbought = extreme_overbought
-        
-        self.fetcher = DataFetcher()
+        # Upper edge (inclusive) of every zone but the last, ascending
+        self._zone_edges = np.array([
+            extreme_oversold, oversold, neutral_low,
+            neutral_high, overbought, extreme_overbought
+        ], dtype=np.float64)
+        
+        # Non-blocking fetches; reuse the caller's exchange connection when
+        # given one, else open our own (call close() when done)
+        self._owns_fetcher = fetcher is None
+        self.fetcher = fetcher if fetcher is not None else AsyncDataFetcher()
         self.rsi_calc = RSICalculator()
         
+        # Bound in-flight fetches and space them by the exchange's rate limit
+        # (ccxt rateLimit = ms between requests)
+        self._fetch_sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        rate_limit_ms = getattr(self.fetcher.exchange, 'rateLimit', None) or 50
+        self._fetch_limiter = RateLimiter(rate=1, period=rate_limit_ms / 1000)
+        
         # Track problematic coins for debugging
-        self.problematic_coins = []
+        self.problematic_coins = set()
     
     def get_rsi_zone(self, rsi):
         """Determine which RSI zone a value belongs to"""
-        if rsi <= self.extreme_oversold:
-            return 'EXTREME_OVERSOLD'
-        elif rsi <= self.oversold:
-            return 'OVERSOLD'
-        elif rsi <= self.neutral_low:
-            return 'OVERSOLD_ZONE'
-        elif rsi <= self.neutral_high:
-            return 'NEUTRAL'
-        elif rsi <= self.overbought:
-            return 'OVERBOUGHT_ZONE'
-        elif rsi <= self.extreme_overbought:
-            return 'OVERBOUGHT'
-        else:
-            return 'EXTREME_OVERBOUGHT'
+        # side='left': a value equal to an edge stays in the lower zone
+        return ZONE_NAMES[np.searchsorted(self._zone_edges, rsi, side='left')]
     
-    def get_rsi_trend(self, df):
-        """Determine if RSI is rising or falling"""
-        if len(df) < 5:
+    def get_rsi_trend(self, rsi):
+        """Determine if RSI is rising or falling (rsi: 1-D NumPy array)"""
+        if len(rsi) < 5:
             return 'unknown'
         
-        recent_rsi = df['rsi'].tail(5)
-        
         # Compare last 3 vs previous 2
-        recent_avg = recent_rsi.tail(3).mean()
-        previous_avg = recent_rsi.head(2).mean()
+        recent_avg = rsi[-3:].mean()
+        previous_avg = rsi[-5:-3].mean()
         
         if recent_avg > previous_avg + 2:
             return 'rising'
@@ -79,7 +181,7 @@ class RSIZoneScanner:
         else:
             return 'stable'
     
-    def _validate_rsi_data(self, df, symbol):
+    def _validate_rsi_data(self, rsi, close, symbol):
         """
         Validate RSI data to catch false/corrupted data
         
@@ -87,100 +189,115 @@ class RSIZoneScanner:
         - RSI shows extreme values incorrectly
         - Data has gaps or corrupted candles
         - RSI calculation fails
+        
+        rsi and close are the NumPy arrays behind the DataFrame columns.
         """
-        if df is None or len(df) < 20:
-            return False, "Insufficient data"
-        
-        # Check if RSI column exists
-        if 'rsi' not in df.columns:
-            return False, "RSI not calculated"
-        
-        # Get current RSI
-        current_rsi = df['rsi'].iloc[-1]
-        
-        # Check for NaN or invalid RSI
-        if pd.isna(current_rsi) or current_rsi < 0 or current_rsi > 100:
-            return False, f"Invalid RSI value: {current_rsi}"
-        
-        # Check recent RSI history for consistency
-        recent_rsi = df['rsi'].tail(10)
-        
-        # Count NaN values
-        nan_count = recent_rsi.isna().sum()
-        if nan_count > 3:  # More than 3 NaN in last 10 candles
-            return False, f"Too many NaN RSI values: {nan_count}/10"
-        
-        # Check for extreme volatility (potential data corruption)
-        # RSI shouldn't swing more than 50 points in 1 candle normally
-        rsi_diffs = recent_rsi.diff().abs()
-        max_diff = rsi_diffs.max()
-        if max_diff > 50:
-            return False, f"Extreme RSI volatility detected: {max_diff:.1f}"
-        
-        # Check price data quality
-        recent_prices = df['close'].tail(10)
-        if recent_prices.isna().any():
-            return False, "NaN in price data"
-        
-        # Check for zero or negative prices
-        if (recent_prices <= 0).any():
-            return False, "Invalid price data (<=0)"
-        
-        # All checks passed
-        return True, "OK"
+        valid, reasons = self._validate_batch([rsi], [close])
+        return bool(valid[0]), reasons[0]
     
-    async def scan_single_coin(self, symbol, timeframe):
+    def _validate_batch(self, rsi_arrays, close_arrays):
         """
-        Scan a single coin for RSI level with validation
+        _validate_rsi_data() for many coins at once
+        
+        Stacks the last 10 RSI/close values of every coin into (N, 10)
+        matrices so each check is one NumPy op over all coins.
         
         Returns:
-            Dict with coin info or None if error/invalid data
+            (bool array of valid coins, list of reasons - "OK" when valid)
+        """
+        n = len(rsi_arrays)
+        enough = np.fromiter((len(rsi) >= 20 for rsi in rsi_arrays), dtype=bool, count=n)
+        
+        # Coins with too little data get an all-NaN placeholder row
+        rsi_mat = np.full((n, 10), np.nan)
+        close_mat = np.full((n, 10), np.nan)
+        for i in np.flatnonzero(enough):
+            rsi_mat[i] = rsi_arrays[i][-10:]
+            close_mat[i] = close_arrays[i][-10:]
+        
+        current_rsi = rsi_mat[:, -1]
+        bad_rsi = np.isnan(current_rsi) | (current_rsi < 0) | (current_rsi > 100)
+        
+        # More than 3 NaN in last 10 candles
+        nan_count = np.isnan(rsi_mat).sum(axis=1)
+        
+        # RSI shouldn't swing more than 50 points in 1 candle normally.
+        # fmax skips NaN (no warning on the all-NaN placeholder rows)
+        max_diff = np.fmax.reduce(np.abs(np.diff(rsi_mat, axis=1)), axis=1)
+        
+        # Price data quality: NaN, zero or negative prices
+        price_nan = np.isnan(close_mat).any(axis=1)
+        price_bad = (close_mat <= 0).any(axis=1)
+        
+        # First failing check per coin, in the same order as the scalar checks
+        checks = (
+            (~enough, lambda i: "Insufficient data"),
+            (bad_rsi, lambda i: f"Invalid RSI value: {current_rsi[i]}"),
+            (nan_count > 3, lambda i: f"Too many NaN RSI values: {nan_count[i]}/10"),
+            (max_diff > 50, lambda i: f"Extreme RSI volatility detected: {max_diff[i]:.1f}"),
+            (price_nan, lambda i: "NaN in price data"),
+            (price_bad, lambda i: "Invalid price data (<=0)"),
+        )
+        
+        valid = np.ones(n, dtype=bool)
+        reasons = ["OK"] * n
+        for failed, reason in checks:
+            for i in np.flatnonzero(failed & valid):
+                reasons[i] = reason(i)
+            valid &= ~failed
+        
+        return valid, reasons
+    
+    def _skip_invalid(self, symbol, timeframe, validation_msg):
+        """Record a coin that failed validation, warning once per scan"""
+        if symbol not in self.problematic_coins:
+            self.problematic_coins.add(symbol)
+            print(f"⚠️ Skipping {symbol} ({timeframe}): {validation_msg}")
+    
+    async def _fetch_with_rsi(self, symbol, timeframe):
+        """
+        Fetch candles and calculate RSI
+        
+        Returns:
+            (df, rsi array, close array) or None if error/insufficient data
         """
         try:
             # Fetch data with appropriate limit for timeframe
-            limit_map = {
-                '15m': 100,
-                '30m': 100,
-                '1h': 150,
-                '4h': 200
-            }
-            limit = limit_map.get(timeframe, 100)
+            limit = _LIMIT_MAP.get(timeframe, 100)
             
-            df = self.fetcher.fetch_ohlcv(symbol, timeframe, limit=limit)
+            # Async fetch so concurrent scans overlap on one connection pool.
+            # Cache hits don't count against the exchange rate limit
+            async with self._fetch_sem:
+                if not is_cached(symbol, timeframe, limit):
+                    await self._fetch_limiter.acquire()
+                df = await cached_fetch_async(self.fetcher, symbol, timeframe, limit)
             if df is None or len(df) < 20:
                 return None
             
             # Calculate RSI
             df = self.rsi_calc.calculate_rsi(df)
+            return df, df['rsi'].to_numpy(), df['close'].to_numpy(dtype=float)
             
-            # ✅ VALIDATE DATA (XMR/USDT fix)
-            is_valid, validation_msg = self._validate_rsi_data(df, symbol)
-            if not is_valid:
-                if symbol not in self.problematic_coins:
-                    self.problematic_coins.append(symbol)
-                    print(f"⚠️ Skipping {symbol} ({timeframe}): {validation_msg}")
-                return None
-            
+        except Exception as e:
+            # Log error for debugging but continue scanning
+            print(f"⚠️ Error scanning {symbol} ({timeframe}): {str(e)[:50]}")
+            return None
+    
+    def _build_result(self, symbol, timeframe, df, rsi_arr, close_arr):
+        """Zone, trend and price change of a coin whose data passed validation"""
+        try:
             # Get current values
-            current_rsi = df['rsi'].iloc[-1]
-            current_price = df['close'].iloc[-1]
-            
-            # Get zone
-            zone = self.get_rsi_zone(current_rsi)
+            current_rsi = rsi_arr[-1]
+            current_price = close_arr[-1]
             
-            # Get trend
-            trend = self.get_rsi_trend(df)
+            # Get zone and trend in one compiled pass
+            zone_code, trend_code = classify_and_trend(rsi_arr, self._zone_edges)
+            zone = ZONE_NAMES[zone_code]
+            trend = TREND_NAMES[trend_code]
             
             # Calculate price change (last 24 hours approximation)
-            timeframe_to_candles = {
-                '15m': 96,   # 96 * 15min = 24h
-                '30m': 48,   # 48 * 30min = 24h
-                '1h': 24,    # 24 * 1h = 24h
-                '4h': 6      # 6 * 4h = 24h
-            }
-            
-            lookback = min(timeframe_to_candles.get(timeframe, 24), len(df))
-            price_24h_ago = df['close'].iloc[-lookback]
+            lookback = min(_TF_TO_CANDLES_24H.get(timeframe, 24), len(close_arr))
+            price_24h_ago = close_arr[-lookback]
             price_change_24h = ((current_price - price_24h_ago) / price_24h_ago) * 100
             
             return {
@@ -199,51 +316,93 @@ class RSIZoneScanner:
             print(f"⚠️ Error scanning {symbol} ({timeframe}): {str(e)[:50]}")
             return None
     
-    async def scan_all_coins(self, timeframes=['15m', '30m', '1h', '4h'], coins=None):
+    async def scan_single_coin(self, symbol, timeframe):
+        """
+        Scan a single coin for RSI level with validation
+        
+        Returns:
+            Dict with coin info or None if error/invalid data
+        """
+        fetched = await self._fetch_with_rsi(symbol, timeframe)
+        if fetched is None:
+            return None
+        
+        # ✅ VALIDATE DATA (XMR/USDT fix)
+        df, rsi_arr, close_arr = fetched
+        is_valid, validation_msg = self._validate_rsi_data(rsi_arr, close_arr, symbol)
+        if not is_valid:
+            self._skip_invalid(symbol, timeframe, validation_msg)
+            return None
+        
+        return self._build_result(symbol, timeframe, df, rsi_arr, close_arr)
+    
+    async def scan_all_coins(self, timeframes=['15m', '30m', '1h', '4h'], coins=None,
+                             categorize=False):
         """
         Scan all coins across multiple timeframes
         
         Args:
             timeframes: List of timeframes to scan (default: 15m, 30m, 1h, 4h)
             coins: List of coins (default: DEFAULT_WATCHLIST)
+            categorize: Bucket coins by zone as they're scanned and return
+                        what categorize_results() would for each timeframe
         
         Returns:
-            Dict with results by timeframe
+            Dict with results (or categorized results) by timeframe
         """
         if coins is None:
             coins = DEFAULT_WATCHLIST
         
-        results = {tf: [] for tf in timeframes}
+        # One slot per coin, filled by index (gather keeps job order)
+        results = {tf: [None] * len(coins) for tf in timeframes}
+        zone_buckets = {tf: [[] for _ in ZONE_NAMES] for tf in timeframes}
         
         print(f"\n🔍 Scanning {len(coins)} coins across {len(timeframes)} timeframes...")
         print(f"   Timeframes: {', '.join(timeframes)}")
         
-        # Reset problematic coins list
-        self.problematic_coins = []
+        # Reset problematic coins
+        self.problematic_coins = set()
+        
+        # One fan-out over every (timeframe, coin) pair, bounded by
+        # self._fetch_sem and the exchange rate limit
+        jobs = [(tf, i, symbol) for tf in timeframes for i, symbol in enumerate(coins)]
+        fetched = await asyncio.gather(
+            *[self._fetch_with_rsi(symbol, tf) for tf, _, symbol in jobs]
+        )
+        ready = [(job, data) for job, data in zip(jobs, fetched) if data is not None]
+        
+        # ✅ VALIDATE DATA (XMR/USDT fix) - every fetched frame in one pass
+        valid, reasons = self._validate_batch(
+            [data[1] for _, data in ready], [data[2] for _, data in ready]
+        )
+        
+        for ((tf, i, symbol), data), is_valid, validation_msg in zip(ready, valid, reasons):
+            if not is_valid:
+                self._skip_invalid(symbol, tf, validation_msg)
+                continue
+            result = self._build_result(symbol, tf, *data)
+            results[tf][i] = result
+            if categorize and result:
+                zone_buckets[tf][_ZONE_CODES[result['zone']]].append(result)
         
         for tf in timeframes:
-            print(f"\nScanning {tf} timeframe...")
-            
-            for i, symbol in enumerate(coins, 1):
-                result = await self.scan_single_coin(symbol, tf)
-                if result:
-                    results[tf].append(result)
-                
-                # Progress indicator every 20 coins
-                if i % 20 == 0:
-                    print(f"  Progress: {i}/{len(coins)} coins")
-                
-                # Rate limiting
-                await asyncio.sleep(0.2)
-            
+            results[tf] = [result for result in results[tf] if result]
             print(f"  ✓ Completed {tf}: {len(results[tf])} valid coins")
         
         # Report problematic coins
         if self.problematic_coins:
-            print(f"\n⚠️ Skipped {len(set(self.problematic_coins))} problematic coins: {', '.join(set(self.problematic_coins)[:5])}")
+            skipped = sorted(self.problematic_coins)
+            print(f"\n⚠️ Skipped {len(skipped)} problematic coins: {', '.join(skipped[:5])}")
         
+        if categorize:
+            return {tf: _sort_zone_buckets(zone_buckets[tf]) for tf in timeframes}
         return results
     
+    async def close(self):
+        """Release the exchange connection (a shared fetcher is left to its owner)"""
+        if self._owns_fetcher:
+            await self.fetcher.close()
+    
     def categorize_results(self, results):
         """
         Categorize results by RSI zones
@@ -251,183 +410,91 @@ class RSIZoneScanner:
         Returns:
             Dict with categorized lists
         """
-        categorized = {
-            'extreme_oversold': [],
-            'oversold': [],
-            'oversold_zone': [],
-            'neutral': [],
-            'overbought_zone': [],
-            'overbought': [],
-            'extreme_overbought': []
-        }
-        
-        for coin in results:
-            zone_map = {
-                'EXTREME_OVERSOLD': 'extreme_oversold',
-                'OVERSOLD': 'oversold',
-                'OVERSOLD_ZONE': 'oversold_zone',
-                'NEUTRAL': 'neutral',
-                'OVERBOUGHT_ZONE': 'overbought_zone',
-                'OVERBOUGHT': 'overbought',
-                'EXTREME_OVERBOUGHT': 'extreme_overbought'
-            }
-            
-            category = zone_map.get(coin['zone'], 'neutral')
-            categorized[category].append(coin)
-        
-        # Sort each category by RSI (extremes first)
-        categorized['extreme_oversold'].sort(key=lambda x: x['rsi'])
-        categorized['oversold'].sort(key=lambda x: x['rsi'])
-        categorized['oversold_zone'].sort(key=lambda x: x['rsi'])
-        categorized['overbought_zone'].sort(key=lambda x: x['rsi'], reverse=True)
-        categorized['overbought'].sort(key=lambda x: x['rsi'], reverse=True)
-        categorized['extreme_overbought'].sort(key=lambda x: x['rsi'], reverse=True)
+        categorized = {name.lower(): [] for name in ZONE_NAMES}
+        if not results:
+            return categorized
+        
+        # Bucket by the zone each coin was classified into (the stored rsi is
+        # rounded, so re-deriving zones from it could move edge cases)
+        n = len(results)
+        rsi_vec = np.fromiter((coin['rsi'] for coin in results), dtype=np.float64, count=n)
+        zone_codes = np.fromiter(
+            (_ZONE_CODES.get(coin['zone'], _NEUTRAL_CODE) for coin in results),
+            dtype=np.int8, count=n
+        )
+        
+        # Sort each category by RSI (extremes first), stable like list.sort;
+        # neutral keeps scan order
+        ascending = np.argsort(rsi_vec, kind='stable')
+        descending = np.argsort(-rsi_vec, kind='stable')
+        
+        for code, name in enumerate(ZONE_NAMES):
+            if code == _NEUTRAL_CODE:
+                order = np.flatnonzero(zone_codes == code)
+            else:
+                order = descending if code > _NEUTRAL_CODE else ascending
+                order = order[zone_codes[order] == code]
+            categorized[name.lower()] = [results[i] for i in order]
         
         return categorized
     
     def format_zone_report(self, timeframe, categorized):
         """Format a detailed report for a timeframe"""
-        
-        trend_emoji = {
-            'rising': '📈',
-            'falling': '📉',
-            'stable': '➡️',
-            'unknown': '❓'
-        }
-        
-        report = f"""
+        parts = [f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║  RSI ZONE ANALYSIS - {timeframe.upper()} TIMEFRAME
 ╚══════════════════════════════════════════════════════════════╝
 
-"""
+"""]
+        
+        for key, title, limit in _REPORT_ZONES:
+            _fmt_zone(parts, title, categorized[key], limit)
+        
+        # Summary - count each category once
+        counts = {key: len(coins) for key, coins in categorized.items()}
+        parts.append("📊 SUMMARY\n")
+        parts.append(_RULE)
+        for key, label in _SUMMARY_LABELS:
+            parts.append(f"  {label}{counts[key]:3d} coins\n")
+        parts.append(f"  Total Scanned:        {sum(counts.values()):3d} coins\n")
         
-        # Extreme Oversold (< 25)
-        if categorized['extreme_oversold']:
-            report += "🟣 EXTREME OVERSOLD (RSI < 25) - STRONG BUY ZONE\n"
-            report += "─" * 62 + "\n"
-            for coin in categorized['extreme_oversold']:
-                report += f"  {coin['symbol']:12} RSI: {coin['rsi']:5.1f} {trend_emoji[coin['trend']]} "
-                report += f"Price: ${coin['price']:>10,.4f} ({coin['price_change_24h']:+.2f}%)\n"
-            report += "\n"
-        
-        # Oversold (25-30)
-        if categorized['oversold']:
-            report += "🔵 OVERSOLD (RSI 25-30) - BUY ZONE\n"
-            report += "─" * 62 + "\n"
-            for coin in categorized['oversold']:
-                report += f"  {coin['symbol']:12} RSI: {coin['rsi']:5.1f} {trend_emoji[coin['trend']]} "
-                report += f"Price: ${coin['price']:>10,.4f} ({coin['price_change_24h']:+.2f}%)\n"
-            report += "\n"
-        
-        # Approaching Oversold (30-40)
-        if categorized['oversold_zone']:
-            report += "🟢 APPROACHING OVERSOLD (RSI 30-40)\n"
-            report += "─" * 62 + "\n"
-            for coin in categorized['oversold_zone'][:10]:  # Show top 10
-                report += f"  {coin['symbol']:12} RSI: {coin['rsi']:5.1f} {trend_emoji[coin['trend']]} "
-                report += f"Price: ${coin['price']:>10,.4f} ({coin['price_change_24h']:+.2f}%)\n"
-            if len(categorized['oversold_zone']) > 10:
-                report += f"  ... and {len(categorized['oversold_zone']) - 10} more\n"
-            report += "\n"
-        
-        # Approaching Overbought (60-70)
-        if categorized['overbought_zone']:
-            report += "🟡 APPROACHING OVERBOUGHT (RSI 60-70)\n"
-            report += "─" * 62 + "\n"
-            for coin in categorized['overbought_zone'][:10]:
-                report += f"  {coin['symbol']:12} RSI: {coin['rsi']:5.1f} {trend_emoji[coin['trend']]} "
-                report += f"Price: ${coin['price']:>10,.4f} ({coin['price_change_24h']:+.2f}%)\n"
-            if len(categorized['overbought_zone']) > 10:
-                report += f"  ... and {len(categorized['overbought_zone']) - 10} more\n"
-            report += "\n"
-        
-        # Overbought (70-75)
-        if categorized['overbought']:
-            report += "🟠 OVERBOUGHT (RSI 70-75) - SELL ZONE\n"
-            report += "─" * 62 + "\n"
-            for coin in categorized['overbought']:
-                report += f"  {coin['symbol']:12} RSI: {coin['rsi']:5.1f} {trend_emoji[coin['trend']]} "
-                report += f"Price: ${coin['price']:>10,.4f} ({coin['price_change_24h']:+.2f}%)\n"
-            report += "\n"
-        
-        # Extreme Overbought (> 75)
-        if categorized['extreme_overbought']:
-            report += "🔴 EXTREME OVERBOUGHT (RSI > 75) - STRONG SELL ZONE\n"
-            report += "─" * 62 + "\n"
-            for coin in categorized['extreme_overbought']:
-                report += f"  {coin['symbol']:12} RSI: {coin['rsi']:5.1f} {trend_emoji[coin['trend']]} "
-                report += f"Price: ${coin['price']:>10,.4f} ({coin['price_change_24h']:+.2f}%)\n"
-            report += "\n"
-        
-        # Summary
-        total = sum(len(v) for v in categorized.values())
-        report += "📊 SUMMARY\n"
-        report += "─" * 62 + "\n"
-        report += f"  Extreme Oversold:     {len(categorized['extreme_oversold']):3d} coins\n"
-        report += f"  Oversold:             {len(categorized['oversold']):3d} coins\n"
-        report += f"  Approaching Oversold: {len(categorized['oversold_zone']):3d} coins\n"
-        report += f"  Neutral:              {len(categorized['neutral']):3d} coins\n"
-        report += f"  Approaching Overbought:{len(categorized['overbought_zone']):3d} coins\n"
-        report += f"  Overbought:           {len(categorized['overbought']):3d} coins\n"
-        report += f"  Extreme Overbought:   {len(categorized['extreme_overbought']):3d} coins\n"
-        report += f"  Total Scanned:        {total:3d} coins\n"
-        
-        return report
+        return "".join(parts)
     
-    def format_telegram_message(self, timeframe, categorized):
-        """Format a Telegram-friendly message"""
+    def format_telegram_message(self, timeframe, categorized, scan_time=None):
+        """
+        Format a Telegram-friendly message
+        
+        scan_time ('HH:MM:SS') lets callers formatting several timeframes
+        stamp them all with one value; defaults to now.
+        """
+        if scan_time is None:
+            scan_time = time.strftime('%H:%M:%S')
         
-        message = f"""
+        parts = [f"""
 <b>📊 RSI ZONES - {timeframe.upper()}</b>
 
-"""
+"""]
         
         # Only show interesting zones (not neutral)
         has_content = False
         
-        if categorized['extreme_oversold']:
-            has_content = True
-            message += f"<b>🟣 EXTREME OVERSOLD ({len(categorized['extreme_oversold'])})</b>\n"
-            for coin in categorized['extreme_oversold'][:5]:
-                trend = '📈' if coin['trend'] == 'rising' else '📉' if coin['trend'] == 'falling' else '➡️'
-                message += f"  {coin['symbol']} - RSI {coin['rsi']} {trend}\n"
-            message += "\n"
-        
-        if categorized['oversold']:
-            has_content = True
-            message += f"<b>🔵 OVERSOLD ({len(categorized['oversold'])})</b>\n"
-            for coin in categorized['oversold'][:5]:
-                trend = '📈' if coin['trend'] == 'rising' else '📉' if coin['trend'] == 'falling' else '➡️'
-                message += f"  {coin['symbol']} - RSI {coin['rsi']} {trend}\n"
-            message += "\n"
-        
-        if categorized['overbought']:
-            has_content = True
-            message += f"<b>🟠 OVERBOUGHT ({len(categorized['overbought'])})</b>\n"
-            for coin in categorized['overbought'][:5]:
-                trend = '📈' if coin['trend'] == 'rising' else '📉' if coin['trend'] == 'falling' else '➡️'
-                message += f"  {coin['symbol']} - RSI {coin['rsi']} {trend}\n"
-            message += "\n"
-        
-        if categorized['extreme_overbought']:
+        for key, title in _TELEGRAM_ZONES:
+            coins = categorized[key]
+            if not coins:
+                continue
             has_content = True
-            message += f"<b>🔴 EXTREME OVERBOUGHT ({len(categorized['extreme_overbought'])})</b>\n"
-            for coin in categorized['extreme_overbought'][:5]:
-                trend = '📈' if coin['trend'] == 'rising' else '📉' if coin['trend'] == 'falling' else '➡️'
-                message += f"  {coin['symbol']} - RSI {coin['rsi']} {trend}\n"
-            message += "\n"
+            parts.append(f"<b>{title} ({len(coins)})</b>\n")
+            for coin in coins[:5]:
+                trend = _TELEGRAM_TREND_EMOJI.get(coin['trend'], '➡️')
+                parts.append(f"  {coin['symbol']} - RSI {coin['rsi']} {trend}\n")
+            parts.append("\n")
         
         if not has_content:
-            message += "<i>No extreme zones detected in this timeframe</i>\n\n"
+            parts.append("<i>No extreme zones detected in this timeframe</i>\n\n")
         
-        message += f"<i>Scan time: {datetime.now().strftime('%H:%M:%S')}</i>"
+        parts.append(f"<i>Scan time: {scan_time}</i>")
         
-        return message.strip()
-
-
-# Add missing pandas import
-import pandas as pd
+        return "".join(parts).strip()
 
 
 # Standalone test
@@ -450,15 +517,16 @@ async def main():
     # Scan all timeframes
     results = await scanner.scan_all_coins(
         timeframes=['15m', '30m', '1h', '4h'],
-        coins=DEFAULT_WATCHLIST[:30]  # Test with first 30 coins
+        coins=DEFAULT_WATCHLIST[:30],  # Test with first 30 coins
+        categorize=True
     )
     
     # Generate reports for each timeframe
     for timeframe in ['15m', '30m', '1h', '4h']:
-        categorized = scanner.categorize_results(results[timeframe])
-        report = scanner.format_zone_report(timeframe, categorized)
+        report = scanner.format_zone_report(timeframe, results[timeframe])
         print(report)
     
+    await scanner.close()
     print("\n✓ RSI zone scanning complete!")
 
 
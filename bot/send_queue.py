@@ -0,0 +1,100 @@
+"""
+Outbound Telegram message queue with rate limiting
+All bot sends go through the queue so Telegram's limits (30 msg/s
+overall, 20 msg/min per chat) are respected without fixed sleeps
+"""
+
+import asyncio
+from telegram.error import RetryAfter
+from utils.logger import logger
+from utils.rate_limiter import RateLimiter
+
+
+class TelegramSendQueue:
+    """
+    Send queue with one worker per chat
+    
+    Messages to a chat go out in the order they were queued, and chats
+    are served concurrently. On a 429 (RetryAfter) only that chat's
+    worker pauses for the requested time, then retries.
+    """
+    
+    MAX_ATTEMPTS = 3
+    
+    def __init__(self, bot, global_rate=30, per_chat_rate=20, per_chat_period=60):
+        self.bot = bot
+        self._global_limiter = RateLimiter(global_rate, 1)
+        self._per_chat_rate = per_chat_rate
+        self._per_chat_period = per_chat_period
+        self._queues = {}
+        self._tasks = {}
+        self._started = False
+    
+    def start(self):
+        """Start the background workers (needs a running event loop)"""
+        self._started = True
+        for chat_id in self._queues:
+            self._start_worker(chat_id)
+    
+    async def stop(self):
+        """Send everything already queued, then stop the workers"""
+        if not self._tasks:
+            self._started = False
+            return
+        for chat_id in self._tasks:
+            await self._queues[chat_id].put(None)
+        await asyncio.gather(*self._tasks.values())
+        self._tasks.clear()
+        self._queues.clear()
+        self._started = False
+    
+    async def put(self, chat_id, text, parse_mode=None):
+        """Queue a message for sending"""
+        # Configured IDs are strings, update.effective_chat.id is an int -
+        # one key per chat so it gets one worker and one rate limiter
+        chat_id = str(chat_id)
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = asyncio.Queue()
+            if self._started:
+                self._start_worker(chat_id)
+        await queue.put((text, parse_mode))
+    
+    def _start_worker(self, chat_id):
+        if chat_id not in self._tasks:
+            limiter = RateLimiter(self._per_chat_rate, self._per_chat_period)
+            self._tasks[chat_id] = asyncio.create_task(
+                self._worker(chat_id, self._queues[chat_id], limiter)
+            )
+    
+    async def _worker(self, chat_id, queue, limiter):
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            
+            text, parse_mode = item
+            await self._send(chat_id, limiter, text, parse_mode)
+    
+    async def _send(self, chat_id, limiter, text, parse_mode):
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            await self._global_limiter.acquire()
+            await limiter.acquire()
+            
+            try:
+                await self.bot.send_message(
+                    chat_id=chat_id,
+                    text=text,
+                    parse_mode=parse_mode
+                )
+                return
+            except RetryAfter as e:
+                # Only this chat's worker sleeps; other chats keep sending
+                logger.warning(f"Telegram rate limit hit for {chat_id}, pausing its sends for {e.retry_after}s "
+                               f"(attempt {attempt}/{self.MAX_ATTEMPTS})")
+                await asyncio.sleep(float(e.retry_after))
+            except Exception as e:
+                logger.error(f"Error sending message to {chat_id}: {e}")
+                return
+        
+        logger.error(f"Dropped message to {chat_id} after {self.MAX_ATTEMPTS} attempts")
@@ -3,68 +3,33 @@ Telegram Bot for RSI Divergence Alerts + RSI Zones Scanner
 FIXED: Now properly receives Telegram commands
 """
 
-from telegram import Update
+from telegram import BotCommand, Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 from telegram.constants import ParseMode
+from telegram.request import HTTPXRequest
 from analyzer.data_fetcher import DataFetcher
 from analyzer.rsi_calculator import RSICalculator
 from analyzer.divergence_detector import HumanLikeDivergenceDetector
 from analyzer.rsi_zones_scanner import RSIZoneScanner
-from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from analyzer.ohlcv_cache import cached_fetch, TIMEFRAME_SECONDS
+from bot.send_queue import TelegramSendQueue
+from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_CHAT_IDS
 from config.coin_list import get_coins_by_category, DEFAULT_WATCHLIST, get_coin_count
+from utils.logger import logger
 from datetime import datetime
 import asyncio
+import concurrent.futures
+import heapq
+import importlib.util
+import time
+from operator import itemgetter
 
-class TelegramBot:
-    """Telegram bot with divergence detection + RSI zone scanning"""
-    
-    def __init__(self):
-        self.token = TELEGRAM_BOT_TOKEN
-        self.chat_id = TELEGRAM_CHAT_ID
-        
-        # Initialize components
-        self.fetcher = DataFetcher()
-        self.rsi_calc = RSICalculator()
-        
-        # Divergence detector
-        # self.detector = ImprovedDivergenceDetector(
-        #     swing_window=2,
-        #     rsi_bull_threshold=55,
-        #     rsi_bear_threshold=45,
-        #     min_price_move_pct=0.3,
-        #     volume_multiplier=0.6,
-        #     use_ema_filter=False,
-        #     divergence_tolerance=0.3
-        # )
-        self.detector = HumanLikeDivergenceDetector(
-            min_peak_prominence=2.0,      # 2% minimum
-            min_rsi_divergence=5.0,       # 5 RSI points minimum
-            lookback_candles=50,
-            require_confirmation=True,     # CRITICAL
-            min_time_between_peaks=5
-        ) 
-        
-        # RSI Zone Scanner
-        self.zone_scanner = RSIZoneScanner(
-            extreme_oversold=25,
-            oversold=30,
-            neutral_low=40,
-            neutral_high=60,
-            overbought=70,
-            extreme_overbought=75
-        )
-        
-        self.app = None
-        self.is_running = False
-        
-        if not self.token:
-            raise ValueError("TELEGRAM_BOT_TOKEN not found in .env file")
-    
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /start command"""
-        print(f"✅ /start command received from {update.effective_user.first_name}")
-        
-        welcome_message = """
+# Static message bodies, built once at import. Only /status has
+# per-call fields, filled in with str.format
+_COIN_COUNT = get_coin_count()
+_TOP10_STR = "\n".join(f'• {coin}' for coin in get_coins_by_category('top')[:10])
+
+_START_MESSAGE = """
 🤖 <b>Enhanced RSI Bot Started!</b>
 
 I monitor cryptocurrency markets and alert you about:
@@ -93,164 +58,15 @@ I monitor cryptocurrency markets and alert you about:
 
 Ready to find opportunities! 🚀
 """
-        await update.message.reply_text(welcome_message, parse_mode=ParseMode.HTML)
-    
-    async def scan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /scan command - full divergence scan"""
-        print(f"✅ /scan command received from {update.effective_user.first_name}")
-        await update.message.reply_text("🔍 Starting full scan... This may take 2-3 minutes.")
-        
-        try:
-            found_divergences = []
-            
-            # Scan top 20 coins on 15m
-            for i, symbol in enumerate(DEFAULT_WATCHLIST[:20], 1):
-                try:
-                    df = self.fetcher.fetch_ohlcv(symbol, '15m', limit=200)
-                    if df is None or len(df) < 50:
-                        continue
-                    
-                    df = self.rsi_calc.calculate_rsi(df)
-                    divs = self.detector.detect_all_divergences(df)
-                    
-                    if divs:
-                        for div in divs:
-                            if div['strength'] >= 15:
-                                div['symbol'] = symbol
-                                div['timeframe'] = '15m'
-                                found_divergences.append(div)
-                    
-                    await asyncio.sleep(0.5)
-                    
-                except Exception as e:
-                    print(f"Error scanning {symbol}: {e}")
-                    continue
-            
-            if found_divergences:
-                found_divergences.sort(key=lambda x: x['strength'], reverse=True)
-                
-                summary = f"✅ <b>Scan Complete!</b>\n\nFound {len(found_divergences)} divergence(s):\n\n"
-                
-                for div in found_divergences:
-                    emoji = "🟢" if div['type'] == 'BULLISH' else "🔴"
-                    summary += f"{emoji} {div['symbol']} - {div['strength_label']} ({div['strength']})\n"
-                
-                await update.message.reply_text(summary, parse_mode=ParseMode.HTML)
-                
-                # Send detailed alerts (max 5)
-                for div in found_divergences[:5]:
-                    alert = self.detector.format_divergence_alert(
-                        div, div['symbol'], div['timeframe']
-                    )
-                    await update.message.reply_text(f"<pre>{alert}</pre>", parse_mode=ParseMode.HTML)
-                    await asyncio.sleep(1)
-                
-                if len(found_divergences) > 5:
-                    await update.message.reply_text(
-                        f"📊 Showing top 5 strongest signals. "
-                        f"{len(found_divergences) - 5} more available."
-                    )
-            else:
-                await update.message.reply_text(
-                    "No divergences detected at this time.\n\n"
-                    "Try /zones to see RSI overbought/oversold coins!"
-                )
-        
-        except Exception as e:
-            await update.message.reply_text(f"❌ Error during scan: {str(e)}")
-    
-    async def quick_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /quick command - quick scan top coins"""
-        print(f"✅ /quick command received from {update.effective_user.first_name}")
-        await update.message.reply_text("⚡ Quick scanning top 10 coins...")
-        
-        try:
-            top_coins = DEFAULT_WATCHLIST[:10]
-            found_divergences = []
-            
-            for symbol in top_coins:
-                try:
-                    df = self.fetcher.fetch_ohlcv(symbol, '15m', limit=200)
-                    if df is None or len(df) < 50:
-                        continue
-                    
-                    df = self.rsi_calc.calculate_rsi(df)
-                    divs = self.detector.detect_all_divergences(df)
-                    
-                    if divs:
-                        for div in divs:
-                            if div['strength'] >= 20:
-                                div['symbol'] = symbol
-                                div['timeframe'] = '15m'
-                                found_divergences.append(div)
-                    
-                    await asyncio.sleep(0.3)
-                    
-                except Exception as e:
-                    continue
-            
-            if found_divergences:
-                found_divergences.sort(key=lambda x: x['strength'], reverse=True)
-                
-                for div in found_divergences[:3]:
-                    alert = self.detector.format_divergence_alert(
-                        div, div['symbol'], div['timeframe']
-                    )
-                    await update.message.reply_text(f"<pre>{alert}</pre>", parse_mode=ParseMode.HTML)
-                    await asyncio.sleep(1)
-            else:
-                await update.message.reply_text("No strong divergences in top 10 coins.")
-        
-        except Exception as e:
-            await update.message.reply_text(f"❌ Error: {str(e)}")
-    
-    async def zones_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /zones command - show RSI overbought/oversold zones for all timeframes"""
-        print(f"✅ /zones command received from {update.effective_user.first_name}")
-        
-        await update.message.reply_text(
-            "🔍 Scanning RSI zones for 15m, 30m, 1h, and 4h timeframes...\n"
-            "This will take 2-3 minutes. Please wait..."
-        )
-        
-        try:
-            # Scan all 4 timeframes
-            results = await self.zone_scanner.scan_all_coins(
-                timeframes=['15m', '30m', '1h', '4h'],
-                coins=DEFAULT_WATCHLIST
-            )
-            
-            # Send results for each timeframe
-            for tf in ['15m', '30m', '1h', '4h']:
-                categorized = self.zone_scanner.categorize_results(results[tf])
-                message = self.zone_scanner.format_telegram_message(tf, categorized)
-                
-                if message.strip():
-                    await update.message.reply_text(message, parse_mode=ParseMode.HTML)
-                else:
-                    await update.message.reply_text(f"📊 {tf}: No extreme RSI zones detected")
-                
-                await asyncio.sleep(1)  # Prevent rate limiting
-            
-            print(f"✅ /zones scan completed for all timeframes")
-            
-        except Exception as e:
-            error_msg = f"❌ Error scanning zones: {str(e)}"
-            print(error_msg)
-            await update.message.reply_text(error_msg)
-    
-    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /status command"""
-        print(f"✅ /status command received from {update.effective_user.first_name}")
-        
-        status_message = f"""
+
+_STATUS_TEMPLATE = """
 📊 <b>Bot Status</b>
 
-<b>🤖 Status:</b> {'🟢 Running' if self.is_running else '🔴 Stopped'}
-<b>⏰ Current Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+<b>🤖 Status:</b> {state}
+<b>⏰ Current Time:</b> {now}
 
 <b>⚙️ Configuration:</b>
-• Monitored Coins: {get_coin_count()}
+• Monitored Coins: {coin_count}
 • Timeframes: 15m, 30m
 • Scan Interval: 15 minutes
 • Detection: Enhanced (3 methods)
@@ -268,21 +84,14 @@ Ready to find opportunities! 🚀
 
 Bot is operational! ✅
 """
-        await update.message.reply_text(status_message, parse_mode=ParseMode.HTML)
-    
-    async def coins_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /coins command"""
-        print(f"✅ /coins command received from {update.effective_user.first_name}")
-        
-        top_coins = get_coins_by_category('top')
-        
-        coins_message = f"""
+
+_COINS_MESSAGE = f"""
 📋 <b>Monitored Cryptocurrencies</b>
 
 <b>🏆 Top 10 Coins:</b>
-{chr(10).join([f'• {coin}' for coin in top_coins[:10]])}
+{_TOP10_STR}
 
-<b>📊 Total Coins:</b> {get_coin_count()}
+<b>📊 Total Coins:</b> {_COIN_COUNT}
 
 <b>Categories:</b>
 • Top Market Cap
@@ -295,13 +104,8 @@ Bot is operational! ✅
 /scan - Scan all for divergences
 /zones - Check RSI zones
 """
-        await update.message.reply_text(coins_message, parse_mode=ParseMode.HTML)
-    
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /help command"""
-        print(f"✅ /help command received from {update.effective_user.first_name}")
-        
-        help_message = """
+
+_HELP_MESSAGE = """
 📖 <b>Help - Enhanced RSI Bot</b>
 
 <b>🎯 Commands:</b>
@@ -354,7 +158,366 @@ Bot is operational! ✅
 <b>⚠️ Disclaimer:</b>
 This bot provides technical analysis, not financial advice. Always do your own research and trade responsibly.
 """
-        await update.message.reply_text(help_message, parse_mode=ParseMode.HTML)
+
+# Command menu shown in Telegram clients, registered once at startup
+_BOT_COMMANDS = [
+    BotCommand("start", "Start the bot"),
+    BotCommand("scan", "Full divergence scan"),
+    BotCommand("quick", "Quick scan of top 10 coins"),
+    BotCommand("zones", "RSI overbought/oversold zones"),
+    BotCommand("status", "Bot status & settings"),
+    BotCommand("coins", "Monitored coins"),
+    BotCommand("help", "Show help"),
+]
+
+# Telegram caps messages at 4096 chars; stay under it with some headroom
+_MAX_MESSAGE_CHARS = 3800
+_ALERT_SEPARATOR = "\n\n" + "─" * 30 + "\n\n"
+
+# Sort/heap key for divergence dicts (C-level, no per-item lambda frame)
+_BY_STRENGTH = itemgetter('strength')
+
+
+def _wrap_pre(alert):
+    """Wrap a formatted alert in a <pre> block for HTML parse mode"""
+    return "<pre>" + alert + "</pre>"
+
+
+def _batch_messages(parts, separator=_ALERT_SEPARATOR, limit=_MAX_MESSAGE_CHARS):
+    """
+    Join message parts into as few messages as possible
+    
+    Parts are never split, so HTML blocks like <pre>...</pre> stay intact.
+    A single part longer than the limit is sent on its own.
+    """
+    batches = []
+    current = []
+    size = 0
+    
+    for part in parts:
+        extra = len(part) + (len(separator) if current else 0)
+        if current and size + extra > limit:
+            batches.append(separator.join(current))
+            current, size = [], 0
+            extra = len(part)
+        current.append(part)
+        size += extra
+    
+    if current:
+        batches.append(separator.join(current))
+    return batches
+
+
+def _build_request():
+    """
+    Pooled keep-alive HTTP client shared by all Bot API calls
+    
+    Uses HTTP/2 when the h2 package is installed, else HTTP/1.1 keep-alive
+    """
+    http_version = "2" if importlib.util.find_spec("h2") else "1.1"
+    return HTTPXRequest(
+        connection_pool_size=20,
+        http_version=http_version,
+        connect_timeout=10
+    )
+
+
+class TelegramBot:
+    """Telegram bot with divergence detection + RSI zone scanning"""
+    
+    def __init__(self, async_fetcher=None):
+        """async_fetcher: AsyncDataFetcher to share with the zone scanner"""
+        self.token = TELEGRAM_BOT_TOKEN
+        self.chat_ids = TELEGRAM_CHAT_IDS
+        self.chat_id = TELEGRAM_CHAT_IDS[0] if TELEGRAM_CHAT_IDS else TELEGRAM_CHAT_ID
+        
+        # Initialize components
+        self.fetcher = DataFetcher()
+        self.rsi_calc = RSICalculator()
+        
+        # Divergence detector
+        # self.detector = ImprovedDivergenceDetector(
+        #     swing_window=2,
+        #     rsi_bull_threshold=55,
+        #     rsi_bear_threshold=45,
+        #     min_price_move_pct=0.3,
+        #     volume_multiplier=0.6,
+        #     use_ema_filter=False,
+        #     divergence_tolerance=0.3
+        # )
+        self.detector = HumanLikeDivergenceDetector(
+            min_peak_prominence=2.0,      # 2% minimum
+            min_rsi_divergence=5.0,       # 5 RSI points minimum
+            lookback_candles=50,
+            require_confirmation=True,     # CRITICAL
+            min_time_between_peaks=5
+        ) 
+        
+        # RSI Zone Scanner
+        self.zone_scanner = RSIZoneScanner(
+            extreme_oversold=25,
+            oversold=30,
+            neutral_low=40,
+            neutral_high=60,
+            overbought=70,
+            extreme_overbought=75,
+            fetcher=async_fetcher
+        )
+        
+        self.app = None
+        self.send_q = None
+        self.is_running = False
+        
+        # Bounds concurrent exchange fetches during /scan and /quick
+        self._scan_sem = asyncio.Semaphore(8)
+        
+        # ccxt is synchronous - fetches run here so they never block the event loop
+        self._fetch_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=16, thread_name_prefix='ohlcv'
+        )
+        
+        # (symbol, timeframe) -> (last candle timestamp, divergences, stored at)
+        # RSI/divergences only change when a new candle appears
+        self._analysis_cache = {}
+        
+        if not self.token:
+            raise ValueError("TELEGRAM_BOT_TOKEN not found in .env file")
+    
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /start command"""
+        logger.info(f"/start command received from {update.effective_user.first_name}")
+        
+        await self._reply(update, _START_MESSAGE, parse_mode=ParseMode.HTML)
+    
+    async def scan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /scan command - full divergence scan"""
+        logger.info(f"/scan command received from {update.effective_user.first_name}")
+        await self._reply(update,
+            "🔍 Starting full scan... This may take 2-3 minutes.\n"
+            "Signals are listed as soon as they're found."
+        )
+        
+        try:
+            # Scan top 20 coins on 15m - a one-line notice goes out per hit as
+            # it's found; detailed alerts wait until the strongest are known
+            found_divergences = []
+            async for div in self._stream_symbols(DEFAULT_WATCHLIST[:20], '15m', min_strength=15):
+                found_divergences.append(div)
+                emoji = "🟢" if div['type'] == 'BULLISH' else "🔴"
+                await self._reply(update, f"{emoji} Found: {div['symbol']} - {div['strength_label']} ({div['strength']})")
+            
+            if found_divergences:
+                found_divergences.sort(key=_BY_STRENGTH, reverse=True)
+                
+                summary = f"✅ <b>Scan Complete!</b>\n\nFound {len(found_divergences)} divergence(s):\n\n"
+                
+                for div in found_divergences:
+                    emoji = "🟢" if div['type'] == 'BULLISH' else "🔴"
+                    summary += f"{emoji} {div['symbol']} - {div['strength_label']} ({div['strength']})\n"
+                
+                await self._reply(update, summary, parse_mode=ParseMode.HTML)
+                
+                # Send detailed alerts (max 5), batched into as few messages as fit
+                await self._reply_alerts(update, found_divergences[:5])
+                
+                if len(found_divergences) > 5:
+                    await self._reply(update,
+                        f"📊 Showing top 5 strongest signals. "
+                        f"{len(found_divergences) - 5} more available."
+                    )
+            else:
+                await self._reply(update,
+                    "No divergences detected at this time.\n\n"
+                    "Try /zones to see RSI overbought/oversold coins!"
+                )
+        
+        except Exception as e:
+            await self._reply(update, f"❌ Error during scan: {str(e)}")
+    
+    async def quick_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /quick command - quick scan top coins"""
+        logger.info(f"/quick command received from {update.effective_user.first_name}")
+        await self._reply(update, "⚡ Quick scanning top 10 coins...")
+        
+        try:
+            top_coins = DEFAULT_WATCHLIST[:10]
+            found_divergences = await self._scan_symbols(
+                top_coins, '15m', min_strength=20, log_errors=False
+            )
+            
+            if found_divergences:
+                # Only the top 3 are sent - no need to sort everything
+                top = heapq.nlargest(3, found_divergences, key=_BY_STRENGTH)
+                await self._reply_alerts(update, top)
+            else:
+                await self._reply(update, "No strong divergences in top 10 coins.")
+        
+        except Exception as e:
+            await self._reply(update, f"❌ Error: {str(e)}")
+    
+    async def _fetch(self, symbol, timeframe, limit, min_rows=None):
+        """Fetch OHLCV (cached) on the fetch thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._fetch_pool, cached_fetch, self.fetcher, symbol, timeframe, limit, min_rows
+        )
+    
+    async def _scan_symbol(self, symbol, timeframe, min_strength):
+        """Fetch, calculate RSI and detect divergences for one symbol"""
+        async with self._scan_sem:
+            df = await self._fetch(symbol, timeframe, 200, min_rows=50)
+        
+        if df is None:
+            return []
+        
+        key = (symbol, timeframe)
+        last_ts = df['timestamp'].iloc[-1]
+        cached = self._analysis_cache.get(key)
+        
+        if cached and cached[0] == last_ts:
+            divs = cached[1]
+        else:
+            df = self.rsi_calc.calculate_rsi(df)
+            divs = self.detector.detect_all_divergences(df)
+            self._analysis_cache[key] = (last_ts, divs, time.monotonic())
+        
+        found = []
+        for div in divs:
+            if div['strength'] >= min_strength:
+                div['symbol'] = symbol
+                div['timeframe'] = timeframe
+                found.append(div)
+        return found
+    
+    async def _scan_symbols(self, symbols, timeframe, min_strength, log_errors=True):
+        """
+        Scan symbols concurrently (bounded by self._scan_sem)
+        
+        Returns a flat list of divergences; per-symbol errors are skipped
+        """
+        self._prune_analysis_cache()
+        
+        results = await asyncio.gather(
+            *[self._scan_symbol(symbol, timeframe, min_strength) for symbol in symbols],
+            return_exceptions=True
+        )
+        
+        found = []
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                if log_errors:
+                    logger.error(f"Error scanning {symbol}: {result}")
+                continue
+            found.extend(result)
+        return found
+    
+    async def _stream_symbols(self, symbols, timeframe, min_strength):
+        """
+        Scan symbols concurrently, yielding divergences as each symbol finishes
+        
+        Producers push hits onto a queue; None marks that all are done.
+        Per-symbol errors are logged and skipped.
+        """
+        self._prune_analysis_cache()
+        out_q = asyncio.Queue()
+        
+        async def produce(symbol):
+            try:
+                for div in await self._scan_symbol(symbol, timeframe, min_strength):
+                    out_q.put_nowait(div)
+            except Exception as e:
+                logger.error(f"Error scanning {symbol}: {e}")
+        
+        async def produce_all():
+            await asyncio.gather(*[produce(symbol) for symbol in symbols])
+            out_q.put_nowait(None)
+        
+        producers = asyncio.create_task(produce_all())
+        try:
+            while (div := await out_q.get()) is not None:
+                yield div
+        finally:
+            # Consumer stopped early (error or cancelled) - stop the scan too
+            producers.cancel()
+    
+    def _prune_analysis_cache(self):
+        """Drop memoized results older than two candles of their timeframe"""
+        now = time.monotonic()
+        stale = [
+            key for key, (_, _, stored_at) in self._analysis_cache.items()
+            if now - stored_at > 2 * TIMEFRAME_SECONDS.get(key[1], 900)
+        ]
+        for key in stale:
+            del self._analysis_cache[key]
+    
+    async def zones_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /zones command - show RSI overbought/oversold zones for all timeframes"""
+        logger.info(f"/zones command received from {update.effective_user.first_name}")
+        
+        await self._reply(update,
+            "🔍 Scanning RSI zones for 15m, 30m, 1h, and 4h timeframes...\n"
+            "This will take 2-3 minutes. Please wait..."
+        )
+        
+        try:
+            # All 4 timeframes go out in one concurrent scan
+            timeframes = ['15m', '30m', '1h', '4h']
+            results = await self.zone_scanner.scan_all_coins(
+                timeframes=timeframes, coins=DEFAULT_WATCHLIST, categorize=True
+            )
+            
+            # Send results for each timeframe
+            scan_time = time.strftime('%H:%M:%S')
+            for tf in timeframes:
+                message = self.zone_scanner.format_telegram_message(tf, results[tf], scan_time)
+                
+                if message.strip():
+                    await self._reply(update, message, parse_mode=ParseMode.HTML)
+                else:
+                    await self._reply(update, f"📊 {tf}: No extreme RSI zones detected")
+            
+            logger.info("/zones scan completed for all timeframes")
+            
+        except Exception as e:
+            error_msg = f"❌ Error scanning zones: {str(e)}"
+            logger.error(error_msg)
+            await self._reply(update, error_msg)
+    
+    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /status command"""
+        logger.info(f"/status command received from {update.effective_user.first_name}")
+        
+        status_message = _STATUS_TEMPLATE.format(
+            state='🟢 Running' if self.is_running else '🔴 Stopped',
+            now=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            coin_count=_COIN_COUNT
+        )
+        await self._reply(update, status_message, parse_mode=ParseMode.HTML)
+    
+    async def coins_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /coins command"""
+        logger.info(f"/coins command received from {update.effective_user.first_name}")
+        
+        await self._reply(update, _COINS_MESSAGE, parse_mode=ParseMode.HTML)
+    
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /help command"""
+        logger.info(f"/help command received from {update.effective_user.first_name}")
+        
+        await self._reply(update, _HELP_MESSAGE, parse_mode=ParseMode.HTML)
+    
+    async def _reply(self, update, text, parse_mode=None):
+        """Queue a reply to the chat an update came from"""
+        await self.send_q.put(update.effective_chat.id, text, parse_mode)
+    
+    async def _reply_alerts(self, update, divergences):
+        """Reply with formatted divergence alerts, combined into few messages"""
+        alerts = [
+            _wrap_pre(self.detector.format_divergence_alert(div, div['symbol'], div['timeframe']))
+            for div in divergences
+        ]
+        for message in _batch_messages(alerts):
+            await self._reply(update, message, parse_mode=ParseMode.HTML)
     
     async def send_alert(self, divergence):
         """Send divergence alert to user"""
@@ -365,25 +528,44 @@ This bot provides technical analysis, not financial advice. Always do your own r
                 divergence.get('timeframe', '15m')
             )
             
-            await self.app.bot.send_message(
-                chat_id=self.chat_id,
-                text=f"<pre>{alert}</pre>",
-                parse_mode=ParseMode.HTML
-            )
+            await self._broadcast(_wrap_pre(alert))
             
         except Exception as e:
-            print(f"Error sending alert: {e}")
+            logger.error(f"Error sending alert: {e}")
+    
+    async def _broadcast(self, message):
+        """Queue a message for every configured chat; each chat sends independently"""
+        for chat_id in self.chat_ids:
+            await self.send_q.put(chat_id, message, ParseMode.HTML)
     
     async def send_message(self, message):
         """Send a text message to user"""
+        await self._broadcast(message)
+    
+    async def send_alerts(self, alerts):
+        """Send formatted alerts to user, combined into as few messages as fit"""
+        for message in _batch_messages([_wrap_pre(alert) for alert in alerts]):
+            await self._broadcast(message)
+    
+    async def _post_init(self, application):
+        """Start the send queue and register the command menu (post_init hook)"""
+        await self._start_send_queue(application)
+        
         try:
-            await self.app.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode=ParseMode.HTML
-            )
+            await application.bot.set_my_commands(_BOT_COMMANDS)
         except Exception as e:
-            print(f"Error sending message: {e}")
+            # The menu is cosmetic - commands work without it
+            logger.warning(f"Could not register bot commands: {e}")
+    
+    async def _start_send_queue(self, application):
+        """Start the outbound send queue"""
+        self.send_q = TelegramSendQueue(application.bot)
+        self.send_q.start()
+    
+    async def _stop_send_queue(self, application=None):
+        """Flush and stop the send queue (also used as post_shutdown hook)"""
+        if self.send_q:
+            await self.send_q.stop()
     
     def setup_handlers(self):
         """Setup command handlers"""
@@ -402,7 +584,7 @@ This bot provides technical analysis, not financial advice. Always do your own r
             print("Initializing Telegram bot...")
             
             # Build application
-            self.app = Application.builder().token(self.token).build()
+            self.app = Application.builder().token(self.token).request(_build_request()).build()
             
             # Setup command handlers
             self.setup_handlers()
@@ -410,11 +592,12 @@ This bot provides technical analysis, not financial advice. Always do your own r
             # Initialize and start
             await self.app.initialize()
             await self.app.start()
+            await self._post_init(self.app)
             
             # ✅ CRITICAL FIX: START POLLING TO RECEIVE MESSAGES
             print("Starting Telegram message polling...")
             await self.app.updater.start_polling(
-                allowed_updates=Update.ALL_TYPES,
+                allowed_updates=[Update.MESSAGE],  # only CommandHandlers are registered
                 drop_pending_updates=True,
                 poll_interval=1.0
             )
@@ -434,6 +617,10 @@ This bot provides technical analysis, not financial advice. Always do your own r
             print("Stopping Telegram polling...")
             await self.app.updater.stop()
         
+        await self._stop_send_queue()
+        self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+        await self.zone_scanner.close()
+        
         if self.app:
             self.is_running = False
             await self.app.stop()
@@ -447,7 +634,14 @@ This bot provides technical analysis, not financial advice. Always do your own r
         print("Starting Enhanced Telegram Bot...")
         print("=" * 60)
         
-        self.app = Application.builder().token(self.token).build()
+        self.app = (
+            Application.builder()
+            .token(self.token)
+            .request(_build_request())
+            .post_init(self._post_init)
+            .post_shutdown(self._stop_send_queue)
+            .build()
+        )
         self.setup_handlers()
         
         self.is_running = True
@@ -456,7 +650,7 @@ This bot provides technical analysis, not financial advice. Always do your own r
         
         # This will start polling automatically
         self.app.run_polling(
-            allowed_updates=Update.ALL_TYPES,
+            allowed_updates=[Update.MESSAGE],  # only CommandHandlers are registered
             drop_pending_updates=True
         )
 
@@ -2,6 +2,8 @@
 Extended list of 120+ cryptocurrency pairs to monitor
 """
 
+import sys
+
 # Top 30 by Market Cap
 TOP_COINS = [
     'BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/USDT', 'XRP/USDT',
@@ -50,7 +52,7 @@ POPULAR_COINS = [
     'NEO/USDT', 'IOTA/USDT', 'OMG/USDT',
     'HOT/USDT', 'ANKR/USDT', 'DENT/USDT', 'IOTX/USDT', 'WAN/USDT',
 ]
-EXTRA_HIGH_LIQUIDITY = [
+EXTRA_HIGH_LIQUIDITY = list(dict.fromkeys([
     'XTZ/USDT',        # Tezos — mentioned in “best coins on Binance” lists. :contentReference[oaicite:4]{index=4}
     'BCH/USDT',        # Bitcoin Cash — also listed in “popular coins” group but could be emphasised.
     'XMR/USDT',        # Monero — privacy-coin, listed on Binance.
@@ -72,27 +74,35 @@ EXTRA_HIGH_LIQUIDITY = [
     'XTZ/USDT',
     'NEO/USDT',
     'IOTA/USDT',
-]
+]))
 
-# Combine all for 130+ coins
-ALL_COINS = list(set(
+# Combine all for 130+ coins (dict.fromkeys dedupes but keeps list order,
+# so scan order is the same on every run). Read-only, so a tuple; use
+# ALL_COINS_SET for membership checks. Symbols are interned - they're used
+# as cache/result keys everywhere, so equal keys compare by identity
+ALL_COINS = tuple(sys.intern(symbol) for symbol in dict.fromkeys(
     TOP_COINS + MID_CAPS + DEFI_COINS + LAYER2_COINS + POPULAR_COINS
+    + EXTRA_HIGH_LIQUIDITY
 ))
+ALL_COINS_SET = frozenset(ALL_COINS)
 
 # Set default to scan ALL 130+ coins
 DEFAULT_WATCHLIST = ALL_COINS
 
+# Category lookup, built once at import
+_CATEGORIES = {
+    'top': tuple(TOP_COINS),
+    'mid': tuple(MID_CAPS),
+    'defi': tuple(DEFI_COINS),
+    'layer2': tuple(LAYER2_COINS),
+    'popular': tuple(POPULAR_COINS),
+    'extra': tuple(EXTRA_HIGH_LIQUIDITY),
+    'all': ALL_COINS
+}
+
 def get_coins_by_category(category='all'):
-    """Get coins by category"""
-    categories = {
-        'top': TOP_COINS,
-        'mid': MID_CAPS,
-        'defi': DEFI_COINS,
-        'layer2': LAYER2_COINS,
-        'popular': POPULAR_COINS,
-        'all': ALL_COINS
-    }
-    return categories.get(category.lower(), ALL_COINS)
+    """Get coins by category (as a tuple)"""
+    return _CATEGORIES.get(category.lower(), ALL_COINS)
 
 def get_coin_count():
     """Get total number of coins"""
@@ -105,4 +115,5 @@ if __name__ == "__main__":
     print(f"  Mid-caps: {len(MID_CAPS)}")
     print(f"  DeFi: {len(DEFI_COINS)}")
     print(f"  Layer 2: {len(LAYER2_COINS)}")
-    print(f"  Popular: {len(POPULAR_COINS)}")
\ No newline at end of file
+    print(f"  Popular: {len(POPULAR_COINS)}")
+    print(f"  Extra high liquidity: {len(EXTRA_HIGH_LIQUIDITY)}")
\ No newline at end of file
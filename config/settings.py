@@ -11,6 +11,12 @@ load_dotenv()
 # Telegram Bot Configuration
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+# Alerts go to every chat in a comma-separated TELEGRAM_CHAT_ID
+TELEGRAM_CHAT_IDS = [c.strip() for c in (TELEGRAM_CHAT_ID or '').split(',') if c.strip()]
+# Public HTTPS base URL; when set, test_telegram.py receives updates by webhook
+# (needs python-telegram-bot[webhooks])
+TELEGRAM_WEBHOOK_URL = os.getenv('TELEGRAM_WEBHOOK_URL')
+WEBHOOK_PORT = int(os.getenv('PORT', 8443))
 
 # Exchange Configuration
 EXCHANGE = 'binance'  # You can change to 'bybit', 'kucoin', etc.
@@ -32,6 +38,9 @@ TIMEFRAMES = ['15m', '30m'] # Scan multiple timeframes for better accuracy
 # Scanning Settings
 SCAN_INTERVAL = int(os.getenv('SCAN_INTERVAL', 120))  # 15 minutes default
 MAX_COINS_PER_SCAN = 100  # Maximum coins to scan in one cycle
+MAX_CONCURRENT_FETCHES = 10  # Exchange fetches in flight at once during scans
+SCAN_BATCH_SIZE = 10  # Symbol/timeframe tasks per scan batch
+SCAN_BATCH_DELAY = 1.0  # Seconds to pause between scan batches
 
 # Volume Settings (for volume confirmation)
 VOLUME_THRESHOLD = 1.0  # Current volume should be 1.2x average volume
@@ -43,10 +52,15 @@ ALERT_COOLDOWN = 3600  # Don't send same alert within 1 hour (in seconds)
 
 # Database Settings
 DATABASE_PATH = 'database/divergences.db'
+OHLCV_CACHE_PATH = 'database/ohlcv_cache.db'  # Candles kept across restarts
+BACKTEST_CACHE_PATH = 'database/backtest_cache.db'  # Kept apart so live trimming doesn't cut backtest history
 
 # Logging Settings
 LOG_LEVEL = 'INFO'  # DEBUG, INFO, WARNING, ERROR
 LOG_FILE = 'logs/bot.log'
+# CONSOLE_LOG=0 drops console logging when stdout isn't a terminal (bot.log only).
+# Left on by default: hosted workers (see Procfile) only keep stdout
+CONSOLE_LOG = os.getenv('CONSOLE_LOG', '1') != '0'
 
 # Validation
 def validate_config():
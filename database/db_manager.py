@@ -4,56 +4,212 @@ UPDATED: Added hours parameter support
 """
 
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
 from config.settings import DATABASE_PATH
 import os
+from pathlib import Path
+
+# Hot statements, shared so every call hits the connection's statement cache
+_INSERT_DIVERGENCE_SQL = '''
+    INSERT INTO divergences 
+    (symbol, timeframe, type, price, rsi, strength, volume_confirmed,
+     detected_at, alerted, alerted_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+_MARK_ALERTED_SQL = '''
+    UPDATE divergences 
+    SET alerted = TRUE, alerted_at = ? 
+    WHERE id = ?
+'''
+
+# Index-only lookup on idx_dedup; stops at the first match
+_DUPLICATE_SQL = '''
+    SELECT 1 FROM divergences
+    WHERE symbol = ?
+    AND timeframe = ?
+    AND type = ?
+    AND alerted = TRUE
+    AND alerted_at > ?
+    LIMIT 1
+'''
+
+# Alerts this recent are also kept in memory, so cooldown checks up to
+# this long never touch the database
+_RECENT_ALERT_WINDOW = 24 * 3600
 
 class DatabaseManager:
     """Manage database operations for divergence tracking"""
     
     def __init__(self, db_path=DATABASE_PATH):
         self.db_path = db_path
+        
+        # Long-lived connections per thread (one read-write, one read-only):
+        # keeps SQLite's page cache warm and skips re-opening the
+        # db/-wal/-shm files on every call
+        self._local = threading.local()
+        self._all_conns = []
+        self._conns_lock = threading.Lock()
+        
         self._ensure_directory_exists()
         self._initialize_database()
+        
+        # (symbol, timeframe, type) -> last alerted_at, for the last day
+        self._recent_alerts = {}
+        self._load_recent_alerts()
     
     def _ensure_directory_exists(self):
         """Create database directory if it doesn't exist"""
-        db_dir = os.path.dirname(self.db_path)
-        if db_dir and not os.path.exists(db_dir):
-            os.makedirs(db_dir)
+        if (db_dir := os.path.dirname(self.db_path)):
+            os.makedirs(db_dir, exist_ok=True)
+    
+    def _connect(self, readonly=False):
+        """Open a connection with the per-connection PRAGMAs applied"""
+        if readonly:
+            target, uri = Path(self.db_path).resolve().as_uri() + '?mode=ro', True
+        else:
+            target, uri = self.db_path, False
+        
+        # Each connection is used by one thread; close() may run on another.
+        # are_duplicates() adds a statement per batch size, so keep a bigger cache.
+        # Read-only connections autocommit so they never hold an old snapshot
+        conn = sqlite3.connect(
+            target, uri=uri, check_same_thread=False, cached_statements=512,
+            isolation_level=None if readonly else ''
+        )
+        conn.execute('PRAGMA synchronous=NORMAL')     # safe with WAL, fewer fsyncs
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')      # ~20MB page cache
+        conn.execute('PRAGMA mmap_size=268435456')    # 256MB
+        conn.execute('PRAGMA busy_timeout=30000')     # wait for a writer instead of failing
+        return conn
+    
+    def _get_conn(self):
+        """Get this thread's read-write connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._conns_lock:
+                self._all_conns.append(conn)
+        return conn
+    
+    def _get_ro_conn(self):
+        """
+        Get this thread's read-only connection, opening it on first use
+        
+        Reads never take the write lock, so with WAL they run alongside a
+        commit. An in-memory database can't be reopened, so it shares the
+        read-write connection.
+        """
+        conn = getattr(self._local, 'ro_conn', None)
+        if conn is None:
+            if self.db_path == ':memory:':
+                conn = self._get_conn()
+            else:
+                conn = self._connect(readonly=True)
+                with self._conns_lock:
+                    self._all_conns.append(conn)
+            self._local.ro_conn = conn
+            self._local.dedup_cursor = conn.cursor()
+        return conn
+    
+    def close(self):
+        """Close all connections opened by this manager"""
+        with self._conns_lock:
+            for conn in self._all_conns:
+                conn.close()
+            self._all_conns.clear()
+        self._local = threading.local()
     
     def _initialize_database(self):
         """Create tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._get_conn()
+        
+        # WAL lets dedup/stats reads run while a save is committing.
+        # The mode is stored in the file, so it only needs setting once
+        if self.db_path != ':memory:':
+            conn.execute('PRAGMA journal_mode=WAL')
+        
+        with conn:
+            # Divergences table
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS divergences (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    price REAL NOT NULL,
+                    rsi REAL NOT NULL,
+                    strength REAL NOT NULL,
+                    volume_confirmed BOOLEAN,
+                    detected_at INTEGER DEFAULT (strftime('%s', 'now')),
+                    alerted BOOLEAN DEFAULT FALSE,
+                    alerted_at INTEGER
+                )
+            ''')
+            
+            # Timestamps are Unix epoch seconds. Convert rows written by older
+            # versions: detected_at was UTC text (CURRENT_TIMESTAMP), alerted_at
+            # local-time text (datetime.now())
+            conn.execute('''
+                UPDATE divergences
+                SET detected_at = CAST(strftime('%s', detected_at) AS INTEGER)
+                WHERE typeof(detected_at) = 'text'
+            ''')
+            conn.execute('''
+                UPDATE divergences
+                SET alerted_at = CAST(strftime('%s', alerted_at, 'utc') AS INTEGER)
+                WHERE typeof(alerted_at) = 'text'
+            ''')
+            
+            # Create index for faster queries
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_symbol_time 
+                ON divergences(symbol, timeframe, detected_at)
+            ''')
+            
+            # Covers the cooldown lookups (is_duplicate_alert / are_duplicates)
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_dedup
+                ON divergences(symbol, timeframe, type, alerted, alerted_at)
+            ''')
+            
+            # Time-range scans: recent divergences, statistics, cleanup
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_detected_at
+                ON divergences(detected_at)
+            ''')
         
-        # Divergences table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS divergences (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                timeframe TEXT NOT NULL,
-                type TEXT NOT NULL,
-                price REAL NOT NULL,
-                rsi REAL NOT NULL,
-                strength REAL NOT NULL,
-                volume_confirmed BOOLEAN,
-                detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                alerted BOOLEAN DEFAULT FALSE,
-                alerted_at TIMESTAMP
-            )
-        ''')
-        
-        # Create index for faster queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_symbol_time 
-            ON divergences(symbol, timeframe, detected_at)
-        ''')
-        
-        conn.commit()
-        conn.close()
         print("✓ Database initialized")
     
+    def _load_recent_alerts(self):
+        """Fill the in-memory cooldown map from the database"""
+        cutoff = int(time.time()) - _RECENT_ALERT_WINDOW
+        rows = self._get_ro_conn().execute('''
+            SELECT symbol, timeframe, type, MAX(alerted_at) FROM divergences
+            WHERE alerted = TRUE AND alerted_at > ?
+            GROUP BY symbol, timeframe, type
+        ''', (cutoff,))
+        self._recent_alerts = {
+            (symbol, timeframe, div_type): alerted_at
+            for symbol, timeframe, div_type, alerted_at in rows
+        }
+    
+    def _remember_alert(self, key, alerted_at):
+        """Record an alert in the in-memory cooldown map"""
+        if alerted_at > self._recent_alerts.get(key, 0):
+            self._recent_alerts[key] = alerted_at
+    
+    def _prune_recent_alerts(self):
+        """Drop in-memory alerts older than the window"""
+        cutoff = int(time.time()) - _RECENT_ALERT_WINDOW
+        self._recent_alerts = {
+            key: alerted_at for key, alerted_at in self._recent_alerts.items()
+            if alerted_at > cutoff
+        }
+    
     def save_divergence(self, divergence):
         """
         Save a divergence or reversal signal to database
@@ -64,49 +220,78 @@ class DatabaseManager:
         Returns:
             Integer: ID of saved record
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.save_divergences([divergence])[0]
+    
+    def save_alerted_divergence(self, divergence):
+        """
+        Save a signal that has already been alerted
         
-        # Get signal type - handle both divergences and RSI S/R signals
-        signal_type = divergence.get('type') or divergence.get('direction') or 'UNKNOWN'
+        One INSERT instead of save_divergence() + mark_as_alerted().
         
-        # Volume confirmed - default to False for RSI S/R signals
-        volume_confirmed = divergence.get('volume_confirmed', False)
+        Returns:
+            Integer: ID of saved record
+        """
+        return self.save_divergences([divergence], alerted=True)[0]
+    
+    def save_divergences(self, divergences, alerted=False):
+        """
+        Save several signals in one transaction (one commit for the batch)
         
-        cursor.execute('''
-            INSERT INTO divergences 
-            (symbol, timeframe, type, price, rsi, strength, volume_confirmed, alerted)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            divergence['symbol'],
-            divergence['timeframe'],
-            signal_type,
-            divergence['current_price'],
-            divergence['current_rsi'],
-            divergence['strength'],
-            volume_confirmed,
-            False
-        ))
-        
-        record_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return record_id
+        Args:
+            divergences: List of signal dictionaries
+            alerted: Store them as already alerted (alerted_at = now)
+        
+        Returns:
+            List of record IDs, in the same order
+        """
+        if not divergences:
+            return []
+        
+        now = int(time.time())
+        alerted_at = now if alerted else None
+        
+        # Signal type: divergences use 'type', RSI S/R signals 'direction'.
+        # Volume confirmed defaults to False for RSI S/R signals
+        rows = [
+            (
+                div['symbol'],
+                div['timeframe'],
+                div.get('type') or div.get('direction') or 'UNKNOWN',
+                div['current_price'],
+                div['current_rsi'],
+                div['strength'],
+                div.get('volume_confirmed', False),
+                now,
+                alerted,
+                alerted_at
+            )
+            for div in divergences
+        ]
+        
+        conn = self._get_conn()
+        with conn:
+            conn.executemany(_INSERT_DIVERGENCE_SQL, rows)
+            # The transaction holds the write lock, so the new IDs are consecutive
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        
+        if alerted:
+            for row in rows:
+                self._remember_alert(row[:3], alerted_at)
+        
+        return list(range(last_id - len(rows) + 1, last_id + 1))
     
     def mark_as_alerted(self, record_id):
         """Mark a divergence as alerted"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE divergences 
-            SET alerted = TRUE, alerted_at = ? 
-            WHERE id = ?
-        ''', (datetime.now(), record_id))
-        
-        conn.commit()
-        conn.close()
+        conn = self._get_conn()
+        alerted_at = int(time.time())
+        with conn:
+            conn.execute(_MARK_ALERTED_SQL, (alerted_at, record_id))
+        
+        key = conn.execute(
+            'SELECT symbol, timeframe, type FROM divergences WHERE id = ?', (record_id,)
+        ).fetchone()
+        if key is not None:
+            self._remember_alert(key, alerted_at)
     
     def is_duplicate_alert(self, symbol, timeframe, divergence_type, hours=2):
         """
@@ -121,25 +306,68 @@ class DatabaseManager:
         Returns:
             Boolean: True if duplicate, False if new
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Calculate cooldown time using hours parameter
-        cooldown_time = datetime.now() - timedelta(hours=hours)
+        cooldown_time = int(time.time() - hours * 3600)
         
-        cursor.execute('''
-            SELECT COUNT(*) FROM divergences
-            WHERE symbol = ?
-            AND timeframe = ?
-            AND type = ?
-            AND alerted = TRUE
-            AND alerted_at > ?
-        ''', (symbol, timeframe, divergence_type, cooldown_time))
-        
-        count = cursor.fetchone()[0]
-        conn.close()
-        
-        return count > 0
+        if hours * 3600 <= _RECENT_ALERT_WINDOW:
+            alerted_at = self._recent_alerts.get((symbol, timeframe, divergence_type))
+            return alerted_at is not None and alerted_at > cooldown_time
+        
+        # Longer than the in-memory window - ask the database.
+        # Reuse this thread's cursor - called once per candidate signal
+        self._get_ro_conn()  # opens the connection and cursor on first use
+        cursor = self._local.dedup_cursor
+        row = cursor.execute(
+            _DUPLICATE_SQL, (symbol, timeframe, divergence_type, cooldown_time)
+        ).fetchone()
+        
+        return row is not None
+    
+    def are_duplicates(self, keys, hours=2):
+        """
+        Batched is_duplicate_alert() - one query for a whole scan cycle
+        
+        Args:
+            keys: Iterable of (symbol, timeframe, type) tuples
+            hours: Cooldown period in hours (default 2)
+        
+        Returns:
+            Set of the keys that were alerted within the cooldown
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return set()
+        
+        cooldown_time = int(time.time() - hours * 3600)
+        
+        if hours * 3600 <= _RECENT_ALERT_WINDOW:
+            self._prune_recent_alerts()
+            return {
+                key for key in keys
+                if self._recent_alerts.get(key, 0) > cooldown_time
+            }
+        
+        # Longer than the in-memory window - ask the database
+        conn = self._get_ro_conn()
+        duplicates = set()
+        
+        # Stay well under SQLite's bound-parameter limit (999 on older builds)
+        for start in range(0, len(keys), 300):
+            chunk = keys[start:start + 300]
+            values = ', '.join(['(?, ?, ?)'] * len(chunk))
+            params = [cooldown_time]
+            for key in chunk:
+                params.extend(key)
+            
+            rows = conn.execute(f'''
+                SELECT DISTINCT symbol, timeframe, type FROM divergences
+                WHERE alerted = TRUE
+                AND alerted_at > ?
+                AND (symbol, timeframe, type) IN (VALUES {values})
+            ''', params)
+            duplicates.update(rows)
+        
+        return duplicates
     
     def get_recent_divergences(self, hours=24):
         """
@@ -149,51 +377,41 @@ class DatabaseManager:
             hours: Number of hours to look back
         
         Returns:
-            List of divergence records
+            List of sqlite3.Row records (access by column name or index),
+            detected_at as Unix epoch seconds
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_ro_conn()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff_time = int(time.time() - hours * 3600)
         
         cursor.execute('''
-            SELECT * FROM divergences
+            SELECT id, symbol, timeframe, type, price, rsi, strength, detected_at
+            FROM divergences
             WHERE detected_at > ?
             ORDER BY detected_at DESC
         ''', (cutoff_time,))
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return rows
+        return cursor.fetchall()
     
     def get_statistics(self):
-        """Get database statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Total divergences
-        cursor.execute('SELECT COUNT(*) FROM divergences')
-        total = cursor.fetchone()[0]
-        
-        # Bullish count
-        cursor.execute("SELECT COUNT(*) FROM divergences WHERE type = 'BULLISH'")
-        bullish = cursor.fetchone()[0]
-        
-        # Bearish count
-        cursor.execute("SELECT COUNT(*) FROM divergences WHERE type = 'BEARISH'")
-        bearish = cursor.fetchone()[0]
-        
-        # Alerted count
-        cursor.execute('SELECT COUNT(*) FROM divergences WHERE alerted = TRUE')
-        alerted = cursor.fetchone()[0]
-        
-        # Last 24 hours
-        cutoff = datetime.now() - timedelta(hours=24)
-        cursor.execute('SELECT COUNT(*) FROM divergences WHERE detected_at > ?', (cutoff,))
-        last_24h = cursor.fetchone()[0]
-        
-        conn.close()
+        """Get database statistics (one pass over the table)"""
+        conn = self._get_ro_conn()
+        
+        cutoff = int(time.time()) - 24 * 3600
+        row = conn.execute('''
+            SELECT
+                COUNT(*),
+                SUM(CASE WHEN type = 'BULLISH' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN type = 'BEARISH' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN alerted = TRUE THEN 1 ELSE 0 END),
+                SUM(CASE WHEN detected_at > ? THEN 1 ELSE 0 END)
+            FROM divergences
+        ''', (cutoff,)).fetchone()
+        
+        # SUM() over an empty table is NULL
+        total, bullish, bearish, alerted, last_24h = (value or 0 for value in row)
         
         return {
             'total': total,
@@ -203,29 +421,43 @@ class DatabaseManager:
             'last_24h': last_24h
         }
     
-    def cleanup_old_records(self, days=30):
+    def cleanup_old_records(self, days=30, batch_size=1000):
         """
         Delete records older than specified days
         
+        Deletes in batches, committing after each, so the write lock is
+        never held for long and alert writes can get in between.
+        
         Args:
             days: Number of days to keep
+            batch_size: Rows deleted per transaction
         
         Returns:
             Number of deleted records
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cutoff_time = datetime.now() - timedelta(days=days)
-        
-        cursor.execute('''
-            DELETE FROM divergences
-            WHERE detected_at < ?
-        ''', (cutoff_time,))
-        
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        conn = self._get_conn()
+        
+        cutoff_time = int(time.time()) - days * 86400
+        deleted = 0
+        
+        while True:
+            with conn:
+                count = conn.execute('''
+                    DELETE FROM divergences
+                    WHERE id IN (
+                        SELECT id FROM divergences
+                        WHERE detected_at < ?
+                        LIMIT ?
+                    )
+                ''', (cutoff_time, batch_size)).rowcount
+            deleted += count
+            
+            if count < batch_size:
+                break
+            time.sleep(0.01)  # let waiting writers take the lock
+        
+        # Refresh query planner stats now and then (cheap, usually a no-op)
+        conn.execute('PRAGMA optimize')
         
         return deleted
 
@@ -3,14 +3,21 @@ ENHANCED RSI Bot - Fixed with Backtesting (1 year data)
 """
 
 import asyncio
+import os
 import signal
+import sqlite3
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from bot.telegram_bot import TelegramBot
-from analyzer.data_fetcher import DataFetcher
+from analyzer.data_fetcher import DataFetcher, AsyncDataFetcher
+from analyzer.ohlcv_cache import cached_fetch_async, TIMEFRAME_SECONDS
+from analyzer.persistent_cache import PersistentOHLCVCache
 from analyzer.rsi_calculator import RSICalculator
 from analyzer.divergence_detector import HumanLikeDivergenceDetector
 from analyzer.rsi_sr_detector import RSISupportResistanceDetector
@@ -19,12 +26,141 @@ from config.settings import (
     SCAN_INTERVAL, 
     SEND_BULLISH_ALERTS, 
     SEND_BEARISH_ALERTS,
+    MAX_CONCURRENT_FETCHES,
+    BACKTEST_CACHE_PATH,
+    SCAN_BATCH_SIZE,
+    SCAN_BATCH_DELAY,
     validate_config
 )
 from config.coin_list import DEFAULT_WATCHLIST, get_coin_count
 from utils.logger import logger
 
 
+# Seconds before the same signal error gets a full traceback again
+_ERROR_TRACE_TTL = 300
+
+_worker_fetcher = None
+_worker_store = None
+
+
+def _fetch_history(symbol, timeframe, limit, use_cache):
+    """
+    Backtest candles, topped up from the local store when use_cache is set
+    
+    Returns (df, store_error). If the store fails, the candles are fetched
+    in full and the error is handed back for the parent process to log.
+    """
+    global _worker_store
+    if use_cache:
+        try:
+            if _worker_store is None:
+                _worker_store = PersistentOHLCVCache(BACKTEST_CACHE_PATH, max_candles=10000)
+            return _worker_store.fetch(
+                _worker_fetcher, symbol, timeframe, limit,
+                TIMEFRAME_SECONDS.get(timeframe, 900)
+            ), None
+        except sqlite3.Error as e:
+            # Store unusable - fall through to a plain fetch
+            return _worker_fetcher.fetch_ohlcv(symbol, timeframe, limit=limit), str(e)
+    return _worker_fetcher.fetch_ohlcv(symbol, timeframe, limit=limit), None
+
+
+def _backtest_symbol(symbol, timeframe, limit, detector, use_cache=True):
+    """
+    Backtest one symbol - runs in a worker process
+    
+    Each worker opens its own exchange connection once and reuses it.
+    Returns (result, candles, start_date, end_date, store_error); result
+    is None when there isn't enough data.
+    """
+    global _worker_fetcher
+    if _worker_fetcher is None:
+        _worker_fetcher = DataFetcher()
+    
+    # Fetch maximum historical data; repeat runs only fetch new candles
+    df, store_error = _fetch_history(symbol, timeframe, limit, use_cache)
+    
+    if df is None or len(df) < 100:
+        return None, 0, None, None, store_error
+    
+    df = RSICalculator().calculate_rsi(df)
+    
+    # Get date range
+    start_date = df['timestamp'].iloc[0]
+    end_date = df['timestamp'].iloc[-1]
+    days_covered = (end_date - start_date).days
+    
+    # Simulate walking through history
+    wins = 0
+    losses = 0
+    signals_found = 0
+    
+    # Test in chunks (simulate real-time detection)
+    window_size = 200
+    step_size = 50
+    
+    # Columns pulled out once; each window is a slice of these arrays
+    high = df['high'].to_numpy()
+    low = df['low'].to_numpy()
+    close = df['close'].to_numpy()
+    rsi = df['rsi'].to_numpy()
+    
+    # Max/min of the 20 candles starting at each index, so each
+    # outcome check is a single lookup
+    future_windows = sliding_window_view(close, 20)
+    future_max = future_windows.max(axis=1)
+    future_min = future_windows.min(axis=1)
+    
+    for i in range(0, len(df) - window_size, step_size):
+        # Detect divergences
+        divs = detector.detect_all_divergences_arr(
+            high, low, close, rsi, i, i + window_size
+        )
+        
+        for div in divs:
+            if div.get('quality', 0) < 60:
+                continue
+            
+            signals_found += 1
+            
+            # Check outcome (look at next 20 candles)
+            signal_idx = i + window_size - 1
+            if signal_idx + 20 >= len(df):
+                continue
+            
+            signal_price = close[signal_idx]
+            
+            if div['type'] == 'BULLISH':
+                # Check if price went up
+                if future_max[signal_idx] > signal_price * 1.02:  # 2% gain
+                    wins += 1
+                else:
+                    losses += 1
+            
+            elif div['type'] == 'BEARISH':
+                # Check if price went down
+                if future_min[signal_idx] < signal_price * 0.98:  # 2% drop
+                    wins += 1
+                else:
+                    losses += 1
+    
+    # Calculate results
+    total_signals = wins + losses
+    accuracy = (wins / total_signals * 100) if total_signals > 0 else 0
+    
+    result = {
+        'symbol': symbol,
+        'signals': signals_found,
+        'tested': total_signals,
+        'wins': wins,
+        'losses': losses,
+        'accuracy': accuracy,
+        'days': days_covered
+    }
+    
+    return result, len(df), start_date, end_date, store_error
+
+
 class EnhancedRSIBot:
     """Enhanced Bot with Human-Like Divergence Detection + Backtesting"""
     
@@ -41,9 +177,13 @@ class EnhancedRSIBot:
         self.mode = mode
         
         # Initialize components
-        self.telegram_bot = TelegramBot()
-        self.fetcher = DataFetcher()
+        # Non-blocking fetches for the scan; backtest workers use their own DataFetcher.
+        # The bot's /zones scanner shares it - one exchange connection pool
+        self.fetcher = AsyncDataFetcher()
+        self.telegram_bot = TelegramBot(async_fetcher=self.fetcher)
         self.rsi_calc = RSICalculator()
+        # RSI carried between scans per (symbol, timeframe) so only new candles are computed
+        self._rsi_state = {}
         
         # Divergence detector
         self.detector = HumanLikeDivergenceDetector(
@@ -71,6 +211,7 @@ class EnhancedRSIBot:
         
         self.is_running = False
         self.scan_count = 0
+        self._traced_errors = {}
         
         logger.info("[OK] Human-like divergence detector loaded")
         logger.info("[OK] RSI Support/Resistance detector loaded")
@@ -78,7 +219,7 @@ class EnhancedRSIBot:
     async def perform_enhanced_scan(self):
         """Enhanced scan with human-like detection"""
         self.scan_count += 1
-        scan_start = datetime.now()
+        scan_start = time.perf_counter()
 
         timeframes = ['15m', '30m']
         logger.info(f"\nStarting ENHANCED scan #{self.scan_count}...")
@@ -89,53 +230,32 @@ class EnhancedRSIBot:
             total_divergences = 0
             total_reversals = 0
 
-            for tf in timeframes:
-                logger.info(f"\n=== Scanning {tf} timeframe ===")
+            # Fetches overlap under a concurrency bound instead of a fixed per-coin sleep
+            sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+            jobs = [(symbol, tf) for tf in timeframes for symbol in DEFAULT_WATCHLIST]
+            
+            # Run in batches with a short pause between them to stay under exchange rate limits
+            for start in range(0, len(jobs), SCAN_BATCH_SIZE):
+                if start:
+                    await asyncio.sleep(SCAN_BATCH_DELAY)
                 
-                for i, symbol in enumerate(DEFAULT_WATCHLIST, 1):
-                    try:
-                        df = self.fetcher.fetch_ohlcv(symbol, tf, limit=200)
-                        if df is None or len(df) < 50:
-                            continue
-
-                        df = self.rsi_calc.calculate_rsi(df)
-
-                        # Divergence detection
-                        divs = self.detector.detect_all_divergences(df)
-                        for div in divs:
-                            if div.get('quality', 0) >= 60:
-                                div['symbol'] = symbol
-                                div['timeframe'] = tf
-                                div['signal_type'] = 'DIVERGENCE'
-                                # ✅ FIX: Add 'strength' key for compatibility
-                                div['strength'] = div.get('quality', 0)
-                                div['volume_confirmed'] = div.get('confirmed', False)
-                                all_signals.append(div)
-                                total_divergences += 1
-                                logger.info(f"  [DIV] {symbol}: {div['type']} "
-                                          f"(Quality: {div['quality']}, {tf})")
-
-                        # S/R detection
-                        reversals = self.sr_detector.detect_all_reversals(df)
-                        for rev in reversals:
-                            if rev['strength'] >= 50:
-                                rev['symbol'] = symbol
-                                rev['timeframe'] = tf
-                                rev['signal_type'] = 'RSI_REVERSAL'
-                                # ✅ Already has 'strength' key
-                                all_signals.append(rev)
-                                total_reversals += 1
-                                logger.info(f"  [S/R] {symbol}: {rev['direction']} "
-                                          f"(Strength: {rev['strength']}, {tf})")
-
-                        if i % 10 == 0:
-                            logger.info(f"  Progress: {i}/{len(DEFAULT_WATCHLIST)} coins")
-
-                        await asyncio.sleep(0.3)
-
-                    except Exception as e:
-                        logger.error(f"Error scanning {symbol} ({tf}): {e}")
+                batch = jobs[start:start + SCAN_BATCH_SIZE]
+                results = await asyncio.gather(
+                    *(self._scan_one(symbol, tf, sem) for symbol, tf in batch),
+                    return_exceptions=True
+                )
+                
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.error(f"Scan task failed: {result}")
                         continue
+                    divs, reversals = result
+                    all_signals.extend(divs)
+                    all_signals.extend(reversals)
+                    total_divergences += len(divs)
+                    total_reversals += len(reversals)
+                
+                logger.info(f"  Progress: {start + len(batch)}/{len(jobs)} checks")
 
             if all_signals:
                 logger.info(f"\n[OK] Found {len(all_signals)} total signals:")
@@ -145,21 +265,77 @@ class EnhancedRSIBot:
             else:
                 logger.info("No high-quality signals found")
 
-            scan_duration = (datetime.now() - scan_start).seconds
-            logger.info(f"Scan #{self.scan_count} completed in {scan_duration} seconds")
+            scan_duration = time.perf_counter() - scan_start
+            logger.info(f"Scan #{self.scan_count} completed in {scan_duration:.2f} seconds")
 
         except Exception as e:
             logger.error(f"Error during scan: {e}", exc_info=True)
             if self.mode == 'production':
                 await self.telegram_bot.send_message(f"[!] Scan error: {str(e)}")
     
+    async def _scan_one(self, symbol, tf, sem):
+        """Fetch and analyze one symbol/timeframe, returning (divergences, reversals)"""
+        divergences = []
+        reversals = []
+        
+        try:
+            # Cached per candle and backed by the persistent store, so repeat
+            # ticks only fetch the candles that are new since the last scan
+            async with sem:
+                df = await cached_fetch_async(self.fetcher, symbol, tf, 200, 50)
+            if df is None:
+                return divergences, reversals
+
+            key = (symbol, tf)
+            df, self._rsi_state[key] = self.rsi_calc.calculate_rsi_streaming(
+                df, self._rsi_state.get(key)
+            )
+
+            # Divergence detection
+            for div in self.detector.detect_all_divergences(df):
+                if div.get('quality', 0) >= 60:
+                    div['symbol'] = symbol
+                    div['timeframe'] = tf
+                    div['signal_type'] = 'DIVERGENCE'
+                    # ✅ FIX: Add 'strength' key for compatibility
+                    div['strength'] = div.get('quality', 0)
+                    div['volume_confirmed'] = div.get('confirmed', False)
+                    divergences.append(div)
+                    logger.info(f"  [DIV] {symbol}: {div['type']} "
+                              f"(Quality: {div['quality']}, {tf})")
+
+            # S/R detection
+            for rev in self.sr_detector.detect_all_reversals(df):
+                if rev['strength'] >= 50:
+                    rev['symbol'] = symbol
+                    rev['timeframe'] = tf
+                    rev['signal_type'] = 'RSI_REVERSAL'
+                    # ✅ Already has 'strength' key
+                    reversals.append(rev)
+                    logger.info(f"  [S/R] {symbol}: {rev['direction']} "
+                              f"(Strength: {rev['strength']}, {tf})")
+
+        except Exception as e:
+            logger.error(f"Error scanning {symbol} ({tf}): {e}")
+        
+        return divergences, reversals
+    
     async def process_signals(self, signals):
         """Process and send alerts"""
         alerts_sent = 0
+        to_send = []
+        alerts = []
+        test_signals = []
         
         # ✅ FIX: Use 'strength' key consistently
         signals.sort(key=lambda x: x.get('strength', 0), reverse=True)
         
+        # One cooldown lookup for the whole batch instead of a query per signal
+        duplicates = self.db.are_duplicates(
+            [(s['symbol'], s['timeframe'], s.get('type') or s.get('direction')) for s in signals],
+            hours=2
+        )
+        
         for signal in signals:
             try:
                 is_bullish = signal.get('type') == 'BULLISH' or signal.get('direction') == 'BULLISH'
@@ -172,13 +348,11 @@ class EnhancedRSIBot:
                 
                 signal_type = signal.get('type') or signal.get('direction')
                 
-                if self.db.is_duplicate_alert(signal['symbol'], signal['timeframe'], 
-                                             signal_type, hours=2):
+                key = (signal['symbol'], signal['timeframe'], signal_type)
+                if key in duplicates:
                     logger.info(f"Skipping duplicate: {signal['symbol']} {signal_type}")
                     continue
                 
-                record_id = self.db.save_divergence(signal)
-                
                 # Format alert
                 if signal.get('signal_type') == 'DIVERGENCE':
                     alert = self.detector.format_divergence_alert(
@@ -190,23 +364,51 @@ class EnhancedRSIBot:
                     )
                 
                 if self.mode == 'production':
-                    await self.telegram_bot.send_message(f"<pre>{alert}</pre>")
-                    self.db.mark_as_alerted(record_id)
-                    alerts_sent += 1
-                    logger.info(f"Alert sent: {signal['symbol']} {signal_type}")
-                    await asyncio.sleep(1.5)
+                    # Sent and saved together after the loop
+                    to_send.append(signal)
+                    alerts.append(alert)
+                    duplicates.add(key)
                 else:
+                    test_signals.append(signal)
                     logger.info(f"[TEST] Would send: {signal['symbol']} {signal_type}")
                 
             except Exception as e:
-                logger.error(f"Error processing signal: {e}")
-                import traceback
-                traceback.print_exc()
+                # Full traceback once per distinct error per TTL; repeats get one line
+                error_key = (type(e).__name__, str(e))
+                now = time.monotonic()
+                if now - self._traced_errors.get(error_key, -_ERROR_TRACE_TTL) >= _ERROR_TRACE_TTL:
+                    # Expired entries would trace again anyway - drop them so
+                    # distinct one-off errors don't pile up over a long run
+                    self._traced_errors = {
+                        key: seen for key, seen in self._traced_errors.items()
+                        if now - seen < _ERROR_TRACE_TTL
+                    }
+                    self._traced_errors[error_key] = now
+                    logger.exception(f"Error processing {signal.get('symbol')}: {e}")
+                else:
+                    logger.error(f"Error processing {signal.get('symbol')}: {e}")
                 continue
         
+        if to_send:
+            try:
+                # Alerts coalesced into as few messages as fit, then one
+                # write saves them all already marked as alerted
+                await self.telegram_bot.send_alerts(alerts)
+                self.db.save_divergences(to_send, alerted=True)
+                alerts_sent = len(to_send)
+                for signal in to_send:
+                    logger.info(f"Alert sent: {signal['symbol']} "
+                              f"{signal.get('type') or signal.get('direction')}")
+            except Exception as e:
+                logger.error(f"Error sending alerts: {e}")
+        
+        if test_signals:
+            # One executemany for the whole scan instead of a commit per signal
+            self.db.save_divergences(test_signals)
+        
         logger.info(f"Sent {alerts_sent} alerts")
     
-    async def backtest(self, symbols=None, timeframe='15m', months=12):
+    async def backtest(self, symbols=None, timeframe='15m', months=12, use_cache=True):
         """
         Backtest divergence detector on 1 year of historical data
         
@@ -214,6 +416,7 @@ class EnhancedRSIBot:
             symbols: List of symbols (default: top 5)
             timeframe: Timeframe to test
             months: Number of months to test (default: 12 = 1 year)
+            use_cache: Reuse candles stored by earlier runs (default True)
         """
         logger.info("="*70)
         logger.info(f"BACKTESTING - {months} MONTHS OF DATA")
@@ -239,97 +442,39 @@ class EnhancedRSIBot:
         
         all_results = []
         
-        for symbol in symbols:
+        # Symbols are independent and CPU-bound, so each runs in its own process
+        loop = asyncio.get_running_loop()
+        workers = min(len(symbols), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = await asyncio.gather(
+                *(loop.run_in_executor(pool, _backtest_symbol, symbol, timeframe, limit,
+                                       self.detector, use_cache)
+                  for symbol in symbols),
+                return_exceptions=True
+            )
+        
+        for symbol, outcome in zip(symbols, outcomes):
             logger.info(f"\nBacktesting {symbol}...")
             
-            try:
-                # Fetch maximum historical data
-                df = self.fetcher.fetch_ohlcv(symbol, timeframe, limit=limit)
-                
-                if df is None or len(df) < 100:
-                    logger.warning(f"  Insufficient data for {symbol}")
-                    continue
-                
-                df = self.rsi_calc.calculate_rsi(df)
-                
-                # Get date range
-                start_date = df['timestamp'].iloc[0]
-                end_date = df['timestamp'].iloc[-1]
-                days_covered = (end_date - start_date).days
-                
-                logger.info(f"  Data: {len(df)} candles ({days_covered} days)")
-                logger.info(f"  Period: {start_date.date()} to {end_date.date()}")
-                
-                # Simulate walking through history
-                wins = 0
-                losses = 0
-                signals_found = 0
-                
-                # Test in chunks (simulate real-time detection)
-                window_size = 200
-                step_size = 50
-                
-                for i in range(0, len(df) - window_size, step_size):
-                    chunk = df.iloc[i:i+window_size].copy()
-                    chunk = chunk.reset_index(drop=True)
-                    
-                    # Detect divergences
-                    divs = self.detector.detect_all_divergences(chunk)
-                    
-                    for div in divs:
-                        if div.get('quality', 0) < 60:
-                            continue
-                        
-                        signals_found += 1
-                        
-                        # Check outcome (look at next 20 candles)
-                        signal_idx = i + window_size - 1
-                        if signal_idx + 20 >= len(df):
-                            continue
-                        
-                        signal_price = df['close'].iloc[signal_idx]
-                        future_prices = df['close'].iloc[signal_idx:signal_idx+20]
-                        
-                        if div['type'] == 'BULLISH':
-                            # Check if price went up
-                            max_future = future_prices.max()
-                            if max_future > signal_price * 1.02:  # 2% gain
-                                wins += 1
-                            else:
-                                losses += 1
-                        
-                        elif div['type'] == 'BEARISH':
-                            # Check if price went down
-                            min_future = future_prices.min()
-                            if min_future < signal_price * 0.98:  # 2% drop
-                                wins += 1
-                            else:
-                                losses += 1
-                
-                # Calculate results
-                total_signals = wins + losses
-                accuracy = (wins / total_signals * 100) if total_signals > 0 else 0
-                
-                result = {
-                    'symbol': symbol,
-                    'signals': signals_found,
-                    'tested': total_signals,
-                    'wins': wins,
-                    'losses': losses,
-                    'accuracy': accuracy,
-                    'days': days_covered
-                }
-                
-                all_results.append(result)
-                
-                logger.info(f"  Signals found: {signals_found}")
-                logger.info(f"  Tested: {total_signals}")
-                logger.info(f"  Wins: {wins} | Losses: {losses}")
-                logger.info(f"  Accuracy: {accuracy:.1f}%")
-                
-            except Exception as e:
-                logger.error(f"  Error backtesting {symbol}: {e}")
+            if isinstance(outcome, Exception):
+                logger.error(f"  Error backtesting {symbol}: {outcome}")
                 continue
+            
+            result, candles, start_date, end_date, store_error = outcome
+            if store_error:
+                logger.warning(f"  Backtest cache unavailable, fetched full history: {store_error}")
+            if result is None:
+                logger.warning(f"  Insufficient data for {symbol}")
+                continue
+            
+            all_results.append(result)
+            
+            logger.info(f"  Data: {candles} candles ({result['days']} days)")
+            logger.info(f"  Period: {start_date.date()} to {end_date.date()}")
+            logger.info(f"  Signals found: {result['signals']}")
+            logger.info(f"  Tested: {result['tested']}")
+            logger.info(f"  Wins: {result['wins']} | Losses: {result['losses']}")
+            logger.info(f"  Accuracy: {result['accuracy']:.1f}%")
         
         # Summary
         if all_results:
@@ -465,8 +610,11 @@ Bot stopped.
         await self.telegram_bot.shutdown()
         logger.info("[OK] Telegram bot stopped")
         
+        await self.fetcher.close()
+        
         deleted = self.db.cleanup_old_records(days=30)
         logger.info(f"[OK] Cleaned up {deleted} old records")
+        self.db.close()
         
         logger.info("="*60)
         logger.info("Shutdown complete")
@@ -5,6 +5,7 @@ Tests all components before running main bot
 
 import sys
 import os
+import importlib.util
 
 def print_section(title):
     print("\n" + "="*60)
@@ -28,11 +29,12 @@ def test_imports():
     
     failed = []
     
+    # find_spec only locates the package - no need to actually import
+    # ccxt/pandas/telegram just to see if they're installed
     for package, description in packages.items():
-        try:
-            __import__(package)
+        if importlib.util.find_spec(package) is not None:
             print(f"✓ {package:15} - {description}")
-        except ImportError:
+        else:
             print(f"✗ {package:15} - {description} (MISSING)")
             failed.append(package)
     
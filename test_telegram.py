@@ -3,10 +3,31 @@ Test Telegram Bot Connection and Commands
 This will show if your bot is actually receiving messages
 """
 
-import asyncio
-from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
-from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from __future__ import annotations
+
+import os
+import signal
+import sys
+from typing import TYPE_CHECKING
+from config.settings import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_WEBHOOK_URL, WEBHOOK_PORT
+
+# python-telegram-bot is imported in main(), so a missing credential
+# exits before paying for the import
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import ContextTypes
+
+# Built on the first main() call and reused by any later call in the
+# same process (e.g. re-running main() from a REPL)
+_APP = None
+
+
+def abort():
+    """Fail fast - no interpreter teardown needed before the bot even starts"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(1)
+
 
 print("=" * 70)
 print("TESTING TELEGRAM BOT CONNECTION")
@@ -14,18 +35,14 @@ print("=" * 70)
 
 # Test 1: Check credentials
 print("\n[1/4] Checking credentials...")
-if not TELEGRAM_BOT_TOKEN:
-    print("❌ TELEGRAM_BOT_TOKEN is empty!")
-    print("   Check your .env file")
-    exit(1)
-else:
-    print(f"✅ Bot token found: {TELEGRAM_BOT_TOKEN[:10]}...{TELEGRAM_BOT_TOKEN[-5:]}")
-
-if not TELEGRAM_CHAT_ID:
-    print("❌ TELEGRAM_CHAT_ID is empty!")
-    exit(1)
-else:
-    print(f"✅ Chat ID found: {TELEGRAM_CHAT_ID}")
+missing = [name for name, value in (('TELEGRAM_BOT_TOKEN', TELEGRAM_BOT_TOKEN),
+                                    ('TELEGRAM_CHAT_ID', TELEGRAM_CHAT_ID)) if not value]
+if missing:
+    sys.stdout.flush()
+    sys.stderr.write(f"❌ Empty in your .env file: {', '.join(missing)}\n")
+    abort()
+print(f"✅ Bot token found: {TELEGRAM_BOT_TOKEN[:10]}...{TELEGRAM_BOT_TOKEN[-5:]}\n"
+      f"✅ Chat ID found: {TELEGRAM_CHAT_ID}")
 
 # Test 2: Create simple bot
 print("\n[2/4] Creating test bot...")
@@ -40,16 +57,31 @@ async def echo_all(update: Update, context: ContextTypes.DEFAULT_TYPE):
     print(f"📩 Message received: {update.message.text}")
     await update.message.reply_text(f"Echo: {update.message.text}")
 
-async def main():
-    print("Creating application...")
-    app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+def main():
+    global _APP
+    from telegram import Update
+    from telegram.ext import Application, CommandHandler, MessageHandler, filters
     
-    # Add test command
-    app.add_handler(CommandHandler("test", test_command))
-    app.add_handler(CommandHandler("ping", test_command))
-    
-    # Add message handler to echo everything
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, echo_all))
+    if _APP is None:
+        print("Creating application...")
+        # HTTP/1.1 keep-alive: no h2 negotiation for the long-poll connection;
+        # concurrent_updates lets handlers run in parallel
+        _APP = (
+            Application.builder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .http_version("1.1")
+            .get_updates_http_version("1.1")
+            .concurrent_updates(True)
+            .build()
+        )
+        
+        # Add test command
+        _APP.add_handler(CommandHandler("test", test_command))
+        _APP.add_handler(CommandHandler("ping", test_command))
+        
+        # Add message handler to echo everything
+        _APP.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, echo_all))
+    app = _APP
     
     print("✅ Test bot created")
     print("\n[3/4] Starting bot...")
@@ -63,23 +95,32 @@ async def main():
     print("\n📱 Send a message to your bot now...")
     print("   Press Ctrl+C to stop\n")
     
-    # Initialize and start
-    await app.initialize()
-    await app.start()
-    await app.updater.start_polling(allowed_updates=Update.ALL_TYPES)
-    
-    # Keep running
-    try:
-        while True:
-            await asyncio.sleep(1)
-    except KeyboardInterrupt:
-        print("\n\nStopping bot...")
-        await app.updater.stop()
-        await app.stop()
-        await app.shutdown()
+    # PTB runs the app until Ctrl+C/SIGTERM, then stops and shuts it down.
+    # close_loop=False keeps the event loop usable for a later main() call
+    if TELEGRAM_WEBHOOK_URL:
+        # Telegram pushes updates to us - no getUpdates loop at all
+        print(f"Receiving updates by webhook on port {WEBHOOK_PORT}")
+        app.run_webhook(
+            listen="0.0.0.0",
+            port=WEBHOOK_PORT,
+            url_path=TELEGRAM_BOT_TOKEN,
+            webhook_url=f"{TELEGRAM_WEBHOOK_URL.rstrip('/')}/{TELEGRAM_BOT_TOKEN}",
+            allowed_updates=Update.ALL_TYPES,
+            stop_signals=(signal.SIGINT, signal.SIGTERM),
+            close_loop=False
+        )
+    else:
+        # Long poll: getUpdates waits up to 25s server-side and returns as soon
+        # as a message arrives; the next request goes out immediately
+        app.run_polling(
+            allowed_updates=Update.ALL_TYPES,
+            timeout=25,
+            poll_interval=0.0,
+            bootstrap_retries=-1,
+            stop_signals=(signal.SIGINT, signal.SIGTERM),
+            close_loop=False
+        )
 
 if __name__ == "__main__":
-    try:
-        asyncio.run(main())
-    except KeyboardInterrupt:
-        print("\n✅ Bot stopped")
\ No newline at end of file
+    main()
+    print("\n✅ Bot stopped")
\ No newline at end of file
@@ -1,127 +1,181 @@
 """
 Test script to diagnose /zones command issues
 Save as: test_zones.py
-Run: python test_zones.py
+Run: python test_zones.py  (or: pytest test_zones.py)
+
+Every check runs in one pass and failures are reported together at the
+end, so one run shows everything that needs fixing.
 """
 
 import sys
 import os
+import mmap
+import asyncio
+import importlib.util
+import traceback
 
-print("=" * 70)
-print("TESTING RSI ZONES FEATURE")
-print("=" * 70)
-
-# Test 1: Check if file exists
-print("\n[1/6] Checking if rsi_zones_scanner.py exists...")
-file_path = os.path.join('analyzer', 'rsi_zones_scanner.py')
-if os.path.exists(file_path):
-    print(f"✅ File exists: {file_path}")
-else:
-    print(f"❌ File NOT found: {file_path}")
-    print("   FIX: Create analyzer/rsi_zones_scanner.py")
-    sys.exit(1)
-
-# Test 2: Check if file has correct content
-print("\n[2/6] Checking file content...")
-try:
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-        if 'class RSIZoneScanner' in content:
-            print("✅ RSIZoneScanner class found")
-        else:
-            print("❌ RSIZoneScanner class NOT found in file")
-            print("   FIX: Make sure file has correct content")
-            sys.exit(1)
-except Exception as e:
-    print(f"❌ Cannot read file: {e}")
-    sys.exit(1)
-
-# Test 3: Try to import
-print("\n[3/6] Testing import...")
-try:
-    from analyzer.rsi_zones_scanner import RSIZoneScanner
+FILE_PATH = os.path.join('analyzer', 'rsi_zones_scanner.py')
+
+# Built once and shared by the checks that need them
+_shared = {}
+
+
+def _loop():
+    """One event loop for every async check in this script"""
+    if 'loop' not in _shared:
+        _shared['loop'] = asyncio.new_event_loop()
+        asyncio.set_event_loop(_shared['loop'])
+    return _shared['loop']
+
+
+def _scanner():
+    """The RSIZoneScanner instance shared by the checks"""
+    if 'scanner' not in _shared:
+        from analyzer.rsi_zones_scanner import RSIZoneScanner
+        _loop()
+        _shared['scanner'] = RSIZoneScanner()
+    return _shared['scanner']
+
+
+def abort():
+    """Fail fast - skip interpreter teardown of ccxt/telegram on the way out"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(1)
+
+
+def test_file_exists():
+    """Check if rsi_zones_scanner.py exists"""
+    try:
+        # One stat, reused for the size in the content check
+        _shared['file_stat'] = os.stat(FILE_PATH)
+    except FileNotFoundError:
+        raise AssertionError(
+            f"File NOT found: {FILE_PATH}\n   FIX: Create analyzer/rsi_zones_scanner.py"
+        )
+    print(f"✅ File exists: {FILE_PATH}")
+
+
+def test_class_present():
+    """Check if the file has the scanner class"""
+    size = _shared['file_stat'].st_size if 'file_stat' in _shared else 0
+    
+    # Search the mapped file in place - no read/decode into a str
+    with open(FILE_PATH, 'rb') as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+        assert mm.find(b'class RSIZoneScanner') != -1, (
+            "RSIZoneScanner class NOT found in file\n"
+            "   FIX: Make sure file has correct content"
+        )
+    print("✅ RSIZoneScanner class found")
+
+
+def test_import():
+    """Try to import the scanner"""
+    try:
+        from analyzer.rsi_zones_scanner import RSIZoneScanner  # noqa: F401
+    except ImportError as e:
+        raise AssertionError(f"Import failed: {e}\n   FIX: Check file syntax and dependencies")
     print("✅ Import successful")
-except ImportError as e:
-    print(f"❌ Import failed: {e}")
-    print("   FIX: Check file syntax and dependencies")
-    sys.exit(1)
-
-# Test 4: Initialize scanner
-print("\n[4/6] Testing scanner initialization...")
-try:
-    scanner = RSIZoneScanner()
+
+
+def test_scanner_init():
+    """Initialize the scanner"""
+    _scanner()
     print("✅ Scanner initialized")
-except Exception as e:
-    print(f"❌ Initialization failed: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-
-# Test 5: Check telegram bot
-print("\n[5/6] Checking Telegram bot integration...")
-try:
-    from bot.telegram_bot import TelegramBot
+
+
+def test_bot_integration():
+    """Check the Telegram bot wires up /zones"""
+    # Probe first so a missing module fails without importing telegram
+    assert importlib.util.find_spec('bot.telegram_bot') is not None, "bot/telegram_bot.py NOT found"
     
-    # Create bot instance
-    bot = TelegramBot()
+    from bot.telegram_bot import TelegramBot
     
-    # Check zones_command
-    if hasattr(bot, 'zones_command'):
-        print("✅ zones_command method exists")
-    else:
-        print("❌ zones_command method NOT found")
-        print("   FIX: Add zones_command to telegram_bot.py")
-        sys.exit(1)
+    # Create bot instance, sharing the scanner's exchange connection
+    bot = TelegramBot(async_fetcher=_scanner().fetcher)
     
-    # Check zone_scanner
-    if hasattr(bot, 'zone_scanner'):
-        print("✅ zone_scanner initialized in bot")
-    else:
-        print("❌ zone_scanner NOT initialized")
-        print("   FIX: Add self.zone_scanner = RSIZoneScanner() to __init__")
-        sys.exit(1)
+    # Check zones_command and zone_scanner: attribute -> (found, missing, fix)
+    required = {
+        'zones_command': ("zones_command method exists",
+                          "zones_command method NOT found",
+                          "Add zones_command to telegram_bot.py"),
+        'zone_scanner': ("zone_scanner initialized in bot",
+                         "zone_scanner NOT initialized",
+                         "Add self.zone_scanner = RSIZoneScanner() to __init__"),
+    }
+    missing = [attr for attr in required if not hasattr(bot, attr)]
+    for attr, (found_msg, missing_msg, fix) in required.items():
+        if attr in missing:
+            print(f"❌ {missing_msg}")
+            print(f"   FIX: {fix}")
+        else:
+            print(f"✅ {found_msg}")
+    assert not missing, f"Missing on TelegramBot: {', '.join(missing)}"
     
     # Check command handler registration
     print("   Checking command handler...")
     # We can't easily test this without starting the bot
     # But if we got here, the method exists
-    
-except Exception as e:
-    print(f"❌ Telegram bot check failed: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-
-# Test 6: Quick functional test
-print("\n[6/6] Testing scanner functionality...")
-try:
-    import asyncio
+
+
+def test_scan_single_coin():
+    """Quick functional test - a None result is a data issue, not a failure"""
+    scanner = _scanner()
     
     async def quick_test():
         # Test single coin scan
         result = await scanner.scan_single_coin('BTC/USDT', '15m')
+        await scanner.close()
         if result:
             print(f"✅ Scanned BTC/USDT successfully")
             print(f"   RSI: {result['rsi']}")
             print(f"   Zone: {result['zone']}")
             print(f"   Trend: {result['trend']}")
-            return True
         else:
             print("⚠️ Scan returned None (data issue, not code issue)")
-            return False
     
-    asyncio.run(quick_test())
+    _loop().run_until_complete(quick_test())
+
+
+CHECKS = [
+    ("Checking if rsi_zones_scanner.py exists", test_file_exists),
+    ("Checking file content", test_class_present),
+    ("Testing import", test_import),
+    ("Testing scanner initialization", test_scanner_init),
+    ("Checking Telegram bot integration", test_bot_integration),
+    ("Testing scanner functionality", test_scan_single_coin),
+]
+
+
+def main():
+    print("=" * 70)
+    print("TESTING RSI ZONES FEATURE")
+    print("=" * 70)
+    
+    failed = []
+    for i, (title, check) in enumerate(CHECKS, 1):
+        print(f"\n[{i}/{len(CHECKS)}] {title}...")
+        try:
+            check()
+        except AssertionError as e:
+            print(f"❌ {e}")
+            failed.append(title)
+        except Exception as e:
+            print(f"❌ {title} failed: {e}")
+            traceback.print_exc()
+            failed.append(title)
     
-except Exception as e:
-    print(f"❌ Functional test failed: {e}")
-    import traceback
-    traceback.print_exc()
-
-# Final summary
-print("\n" + "=" * 70)
-print("TEST SUMMARY")
-print("=" * 70)
-print("""
+    # Final summary
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+    if failed:
+        print(f"\n❌ {len(failed)}/{len(CHECKS)} checks failed:")
+        for title in failed:
+            print(f"   - {title}")
+    else:
+        print(f"\n✅ All {len(CHECKS)} checks passed")
+    print("""
 ✅ If all tests passed:
    1. Stop your bot (Ctrl+C)
    2. Restart: python main.py
@@ -130,7 +184,7 @@ print("""
    5. Check console for any errors
 
 ❌ If any test failed:
-   1. Fix the issue shown above
+   1. Fix the issues shown above
    2. Run this test again
    3. All must pass before /zones will work
 
@@ -140,12 +194,22 @@ print("""
    - Missing imports in telegram_bot.py
    - Syntax errors in code
 """)
+    
+    print("\nTo test manually in Telegram:")
+    print("1. Make sure bot is running")
+    print("2. Type: /zones")
+    print("3. Check console output for errors")
+    print("\nIf /zones does nothing, check:")
+    print("- Bot console for errors")
+    print("- Telegram bot has /zones in command list")
+    print("- setup_handlers() registers zones_command")
+    
+    loop = _shared.pop('loop', None)
+    if loop is not None:
+        loop.close()
+    if failed:
+        abort()
+
 
-print("\nTo test manually in Telegram:")
-print("1. Make sure bot is running")
-print("2. Type: /zones")
-print("3. Check console output for errors")
-print("\nIf /zones does nothing, check:")
-print("- Bot console for errors")
-print("- Telegram bot has /zones in command list")
-print("- setup_handlers() registers zones_command")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
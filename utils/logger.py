@@ -3,45 +3,100 @@ Logger configuration with UTF-8 support for Windows
 Add this to your utils/logger.py file
 """
 
+import atexit
 import logging
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from config.settings import LOG_LEVEL, CONSOLE_LOG
 
-# Force UTF-8 encoding for console output (Windows fix)
+# Force UTF-8 encoding for console output (Windows fix) - switched in place,
+# keeping the existing streams and their buffering
 if sys.platform == 'win32':
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that runs strftime once per second, not once per record"""
+    
+    _cached_second = None
+    _cached_asctime = None
+    
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_asctime = super().formatTime(record, datefmt)
+            self._cached_second = second
+        return self._cached_asctime
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records as they are
+    
+    The stock prepare() formats the message (and any traceback) on the
+    caller's thread so records can be pickled; the queue never leaves this
+    process, so leave all formatting to the listener thread.
+    """
+    
+    def prepare(self, record):
+        return record
+
 
 # Create logger
 logger = logging.getLogger('RSIDivergenceBot')
-logger.setLevel(logging.INFO)
+logger.setLevel(LOG_LEVEL)
 
 # Remove existing handlers to avoid duplicates
 logger.handlers = []
 
 # Console handler with UTF-8 encoding
 console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
+console_handler.setLevel(LOG_LEVEL)
 
 # Formatter
-formatter = logging.Formatter(
+formatter = _CachedTimeFormatter(
     '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 console_handler.setFormatter(formatter)
 
-# Add handler
-logger.addHandler(console_handler)
+handlers = []
 
-# File handler (optional - also with UTF-8)
+# File handler (optional - also with UTF-8). delay=True: bot.log is only
+# opened when the first record is written, so runs that log nothing don't touch it
 try:
-    file_handler = logging.FileHandler('bot.log', encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
+    file_handler = logging.FileHandler('bot.log', encoding='utf-8', delay=True)
+    file_handler.setLevel(LOG_LEVEL)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    handlers.append(file_handler)
 except Exception as e:
     print(f"Warning: Could not create log file: {e}")
 
+# Skip the console copy of every record when output is piped and the user
+# opted out - unless there's no log file to fall back on
+if CONSOLE_LOG or sys.stdout.isatty() or not handlers:
+    handlers.insert(0, console_handler)
+
+# Records go through a queue; a listener thread does the actual stdout/file
+# writes so a slow pipe or disk never blocks the asyncio event loop
+log_queue = queue.SimpleQueue()
+queue_handler = _InProcessQueueHandler(log_queue)
+logger.addHandler(queue_handler)
+
+listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
+
 # Prevent propagation to root logger
-logger.propagate = False
\ No newline at end of file
+logger.propagate = False
+
+# Library loggers (ccxt, httpx, telegram) propagate to the root logger. Give
+# it the queue handler at WARNING so their warnings land in bot.log through
+# the listener thread instead of logging.lastResort's synchronous stderr
+# write, and their debug/info records are dropped at the level check
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.WARNING)
+root_logger.addHandler(queue_handler)
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Async token-bucket rate limiter
+Shared by the Telegram send queue and the exchange fetch paths
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds"""
+    
+    def __init__(self, rate, period):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate,
+                self._tokens + (now - self._updated) * self.rate / self.period
+            )
+            self._updated = now
+            
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            
+            await asyncio.sleep((1 - self._tokens) * self.period / self.rate)